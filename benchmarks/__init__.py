@@ -0,0 +1,4 @@
+"""Benchmarks for py_types' hot paths.
+
+Run them with `python -m benchmarks` from the repository root; see benchmarks/__main__.py for options.
+Each benchmark is a case in benchmarks/cases.py, timed with timeit."""
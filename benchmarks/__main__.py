@@ -0,0 +1,115 @@
+"""Run the benchmarks, optionally saving the results and comparing them to a baseline.
+
+    python -m benchmarks                              run every case and print the results
+    python -m benchmarks -k schema                    only run cases with "schema" in their name
+    python -m benchmarks --save results.json          save the results as JSON
+    python -m benchmarks --compare                    compare against benchmarks/baseline.json
+    python -m benchmarks --compare old.json --threshold 1.2 --fail-on-regression
+
+Each case is timed with timeit: the number of calls per run is picked so that a run takes at least --min-time
+seconds, and the fastest of --repeat runs is kept, as the one least disturbed by the rest of the machine."""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import timeit
+
+from .cases import CASES
+
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def run_case(name, repeat, min_time):
+    """Time one case, returning its result dict."""
+    call = CASES[name]()
+    timer = timeit.Timer(call)
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2
+    best = min(timer.repeat(repeat=repeat, number=number))
+    return {"ns_per_call": best / number * 1e9, "calls_per_run": number, "runs": repeat}
+
+
+def run(names, repeat, min_time):
+    results = {}
+    for name in names:
+        results[name] = run_case(name, repeat, min_time)
+        print("{:<50} {:>14}".format(name, format_ns(results[name]["ns_per_call"])))
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Print each case's time against the baseline's, returning the names of cases slower by more than threshold."""
+    if baseline.get("python") != current["python"]:
+        print("note: the baseline was taken on python {}, these results on {}.".format(baseline.get("python"), current["python"]))
+    regressions = []
+    print("\n{:<50} {:>14} {:>14} {:>8}".format("case", "baseline", "current", "ratio"))
+    for name, result in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            print("{:<50} {:>14} {:>14}".format(name, "-", format_ns(result["ns_per_call"])))
+            continue
+        ratio = result["ns_per_call"] / old["ns_per_call"]
+        if ratio > threshold:
+            verdict = "slower"
+            regressions.append(name)
+        elif ratio < 1 / threshold:
+            verdict = "faster"
+        else:
+            verdict = ""
+        print("{:<50} {:>14} {:>14} {:>7.2f}x {}".format(
+            name, format_ns(old["ns_per_call"]), format_ns(result["ns_per_call"]), ratio, verdict))
+    return regressions
+
+
+def format_ns(ns):
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("us", 1e3)):
+        if ns >= scale:
+            return "{:.2f} {}".format(ns / scale, unit)
+    return "{:.0f} ns".format(ns)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark py_types' hot paths.")
+    parser.add_argument("-k", dest="keyword", help="only run cases whose names contain this")
+    parser.add_argument("--list", action="store_true", help="list the cases and exit")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per case, of which the fastest is kept (default 5)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per run (default 0.2)")
+    parser.add_argument("--save", metavar="PATH", help="save the results as JSON")
+    parser.add_argument("--compare", metavar="PATH", nargs="?", const=BASELINE,
+                        help="compare against saved results (default benchmarks/baseline.json)")
+    parser.add_argument("--threshold", type=float, default=1.1,
+                        help="ratio past which a case counts as slower or faster (default 1.1)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit with status 1 if any case is slower")
+    args = parser.parse_args(argv)
+
+    names = [name for name in CASES if args.keyword is None or args.keyword in name]
+    if args.list:
+        print("\n".join(names))
+        return 0
+
+    current = run(names, args.repeat, args.min_time)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions and args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""The benchmark cases.
+
+Each case is a function registered with @case that sets up its data and returns a zero-argument
+callable to time.  Setup isn't timed."""
+
+from collections import OrderedDict
+
+from py_types.runtime import (
+    schema,
+    SchemaError,
+    SchemaOr,
+    track,
+    typecheck,
+    ValidationCache,
+)
+from py_types.type_defs.base import (
+    TypeFamily,
+    ValidatedType,
+)
+from py_types.type_defs.common import Number
+from py_types.type_defs.structured_types import (
+    TypedDict,
+    TypedSequence,
+)
+
+
+CASES = OrderedDict()
+
+
+def case(name):
+    """Register a case under name."""
+    def register(setup):
+        CASES[name] = setup
+        return setup
+    return register
+
+
+# The schema from the README.
+test_schema = {
+    "hello": int,
+    "world": {
+        "people": [str],
+        "version": int
+    },
+    "optional": SchemaOr(int, type(None))
+}
+
+
+def readme_payload(people):
+    return {"hello": 1, "world": {"people": ["person {}".format(i) for i in range(people)], "version": 2}, "optional": None}
+
+
+#--------------------------
+# schema
+#--------------------------
+
+
+def _readme_schema_case(people, backend):
+    @schema(backend=backend, mode="on")
+    def schema_checked(a: test_schema) -> test_schema:
+        return a
+
+    payload = readme_payload(people)
+    return lambda: schema_checked(payload)
+
+
+for _people in (1, 100, 10000):
+    for _backend in ("closures", "codegen"):
+        case("schema.readme.{}.people={}".format(_backend, _people))(
+            lambda people=_people, backend=_backend: _readme_schema_case(people, backend))
+
+
+@case("schema.readme.tracked.people=10000")
+def tracked_readme():
+    # One write between checks, as when passing a payload through a chain of checked functions.
+    @schema(mode="on")
+    def schema_checked(a: test_schema) -> test_schema:
+        return a
+
+    payload = track(readme_payload(10000))
+
+    def hop():
+        payload["world"]["version"] += 1
+        schema_checked(payload)
+    return hop
+
+
+@case("schema.homogenous_list.1000")
+def homogenous_list():
+    @schema(mode="on")
+    def total(items: [{"id": int, "score": float}]):
+        pass
+
+    items = [{"id": i, "score": i / 2} for i in range(1000)]
+    return lambda: total(items)
+
+
+@case("schema.heterogenous_list.1000")
+def heterogenous_list():
+    # The same items as the homogenous case, but each checked against its own member of the schema.
+    form = [{"id": int, "score": float} for _ in range(1000)]
+
+    @schema(mode="on")
+    def total(items: form):
+        pass
+
+    items = [{"id": i, "score": i / 2} for i in range(1000)]
+    return lambda: total(items)
+
+
+@case("schema.or.fan_out_8")
+def or_fan_out():
+    # The matching schema is last, so every alternative is tried.
+    alternatives = [{"kind": str, "value{}".format(i): int} for i in range(7)] + [{"kind": str, "value": float}]
+
+    @schema(mode="on")
+    def handle(event: [SchemaOr(*alternatives)]):
+        pass
+
+    events = [{"kind": "x", "value": 1.5}] * 100
+    return lambda: handle(events)
+
+
+@case("schema.failure.large_value")
+def failure_large_value():
+    @schema(mode="on")
+    def handle(event: {"id": int, "body": [int]}):
+        pass
+
+    # The failing value is a large dict, which only needs formatting if the error's message is used.
+    event = {"id": 1, "body": {"key {}".format(i): i for i in range(10000)}}
+
+    def call():
+        try:
+            handle(event)
+        except SchemaError:
+            pass
+    return call
+
+
+@case("schema.validation_cache.pairs=1000")
+def validation_cache():
+    @schema(mode="on", cache=ValidationCache())
+    def route(table: [(str, int)]):
+        pass
+
+    # The same table on every call, so each call after the first is a cache hit.
+    table = tuple(("route {}".format(i), i) for i in range(1000))
+    return lambda: route(table)
+
+
+#--------------------------
+# typecheck and decorator overhead
+#--------------------------
+
+
+def _plain(a, b, c=None):
+    return a
+
+
+@case("decorator.none")
+def undecorated():
+    return lambda: _plain(1, 2, c=3)
+
+
+@case("decorator.typecheck.no_annotations")
+def typecheck_no_annotations():
+    checked = typecheck(mode="on")(_plain)
+    return lambda: checked(1, 2, c=3)
+
+
+@case("decorator.schema.no_annotations")
+def schema_no_annotations():
+    checked = schema(mode="on")(_plain)
+    return lambda: checked(1, 2, c=3)
+
+
+@case("decorator.typecheck.three_annotations")
+def typecheck_annotations():
+    @typecheck(mode="on")
+    def checked(a: int, b: int, c: str = None) -> int:
+        return a
+
+    return lambda: checked(1, 2, c="3")
+
+
+#--------------------------
+# type_defs
+#--------------------------
+
+
+class Positive(metaclass=ValidatedType):
+    type_members = [int, float]
+    validators = [lambda value: value > 0]
+
+
+class Scalar(metaclass=TypeFamily):
+    type_members = [Number, str, bytes]
+
+
+@case("type_defs.type_family.isinstance")
+def type_family():
+    values = [1, 2.0, "three", b"four", None] * 20
+    return lambda: [isinstance(value, Scalar) for value in values]
+
+
+@case("type_defs.validated_type.isinstance")
+def validated_type():
+    values = [1, 2.0, -3, "four", None] * 20
+    return lambda: [isinstance(value, Positive) for value in values]
+
+
+@case("type_defs.typed_sequence.100000")
+def typed_sequence():
+    sequence_type = TypedSequence(Number)
+    values = list(range(50000)) + [i / 2 for i in range(50000)]
+    return lambda: isinstance(values, sequence_type)
+
+
+@case("type_defs.typed_dict.10000")
+def typed_dict():
+    dict_type = TypedDict(str, Number)
+    values = {"key {}".format(i): {"inner {}".format(j): j for j in range(10)} for i in range(1000)}
+    return lambda: isinstance(values, dict_type)
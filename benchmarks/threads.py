@@ -0,0 +1,127 @@
+"""Run benchmark cases from several threads at once, to see how throughput scales with the number of threads.
+
+    python -m benchmarks.threads                           every case, with 1, 2, 4, 8 and 16 threads
+    python -m benchmarks.threads -k schema --threads 1,4,16
+    python -m benchmarks.threads --save threads.json
+
+Each case is set up once and its callable shared by every thread, so they all go through the same compiled
+checkers, caches and counters.  Throughput is the number of calls made by all the threads together per second.
+With the GIL, threads take turns and throughput stays flat at best.  On a free-threaded build (python3.13t and later)
+it should grow with the number of threads, up to the number of cores, unless something shared is contended."""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import threading
+import timeit
+from time import perf_counter
+
+from .cases import CASES
+
+
+DEFAULT_THREADS = (1, 2, 4, 8, 16)
+
+
+def gil_enabled():
+    """Whether the GIL is on; always True before python 3.13."""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return True if is_gil_enabled is None else is_gil_enabled()
+
+
+def batch_size(call, min_time=0.001):
+    """How many calls take at least min_time, so the threads only look at the clock between batches."""
+    timer = timeit.Timer(call)
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2
+    return number
+
+
+def run_threads(call, threads, duration, batch=1):
+    """Call call from threads threads for about duration seconds, returning the calls made per second.
+    An exception raised in any thread is raised again here."""
+    start_line = threading.Barrier(threads + 1)
+    stop = threading.Event()
+    calls = [0] * threads
+    errors = []
+
+    def worker(index):
+        start_line.wait()
+        try:
+            while not stop.is_set():
+                for _ in range(batch):
+                    call()
+                calls[index] += batch
+        except BaseException as error:
+            errors.append(error)
+            stop.set()
+
+    workers = [threading.Thread(target=worker, args=(index,), daemon=True) for index in range(threads)]
+    for thread in workers:
+        thread.start()
+    start_line.wait()
+    start = perf_counter()
+    stop.wait(duration)
+    stop.set()
+    for thread in workers:
+        thread.join()
+    elapsed = perf_counter() - start
+    if errors:
+        raise errors[0]
+    return sum(calls) / elapsed
+
+
+def run(names, thread_counts, duration):
+    results = {}
+    print("{:<50} {:>8} {:>14} {:>8}".format("case", "threads", "calls/s", "scaling"))
+    for name in names:
+        call = CASES[name]()
+        batch = batch_size(call)
+        single = None
+        results[name] = {}
+        for threads in thread_counts:
+            throughput = run_threads(call, threads, duration, batch)
+            if single is None:
+                single = throughput
+            scaling = throughput / single
+            results[name][str(threads)] = {"calls_per_second": throughput, "scaling": scaling}
+            print("{:<50} {:>8} {:>14.0f} {:>7.2f}x".format(name, threads, throughput, scaling))
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "gil_enabled": gil_enabled(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.threads",
+                                     description="Measure how py_types' hot paths scale across threads.")
+    parser.add_argument("-k", dest="keyword", help="only run cases whose names contain this")
+    parser.add_argument("--threads", default=",".join(str(count) for count in DEFAULT_THREADS),
+                        help="comma separated thread counts to run with (default 1,2,4,8,16)")
+    parser.add_argument("--duration", type=float, default=1.0, help="seconds per case and thread count (default 1)")
+    parser.add_argument("--save", metavar="PATH", help="save the results as JSON")
+    args = parser.parse_args(argv)
+
+    thread_counts = [int(count) for count in args.threads.split(",")]
+    names = [name for name in CASES if args.keyword is None or args.keyword in name]
+    if not gil_enabled():
+        print("free-threaded build, GIL disabled; {} cpus.\n".format(os.cpu_count()))
+    else:
+        print("the GIL is enabled, so throughput isn't expected to scale; use a free-threaded build to see scaling.\n")
+
+    current = run(names, thread_counts, args.duration)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+            f.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
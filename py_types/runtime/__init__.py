@@ -5,6 +5,29 @@ Includes schema tools and runtime type checks."""
 from .schema import (
     schema,
     SchemaOr,
+    SchemaAllowExtra,
     SchemaError
 )
 from .typecheck import typecheck
+from .checked import checked
+from .config import configure
+from .batch import (
+    validate_many,
+    BatchResult,
+)
+from .stream import (
+    validate_stream,
+    validate_json_lines,
+)
+from .json_schema import (
+    to_json_schema,
+    from_json_schema,
+    save_compiled_schema,
+    load_compiled_schema,
+)
+from .tracked import (
+    track,
+    TrackedDict,
+    TrackedList,
+)
+from ..validation_cache import ValidationCache
@@ -0,0 +1,162 @@
+"""Validating many records against one schema at once.
+
+validate_many compiles the schema a single time and runs it over every record in a plain loop,
+without a decorated function call per record.  Only failures are remembered, and their SchemaErrors
+are only built when asked for.
+
+With workers set, the records are split into chunks and checked in a process pool instead.
+Each worker compiles the schema once, when it starts, and then only has chunks of records sent to it."""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from .schema import (
+    SCHEMA_BACKENDS,
+    _compile_schema,
+    _record_checker,
+    _SchemaMismatch,
+)
+
+
+# Records sent to a worker at a time when validating in a process pool.
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def validate_many(form, records, backend="closures", name="records", workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Check each of records against form, the same way _assert_format_matches checks a single value.
+
+    Returns a BatchResult rather than raising, so that one bad record doesn't hide the others.
+    backend is "closures" or "codegen", as for the schema decorator.
+    name is used in error messages, where record i is reported as name[i].
+
+    workers, if given, is the number of processes to check the records in, chunk_size records at a time.
+    The schema and records have to be picklable for this; TypeFamily classes always are (see type_defs.base).
+    Results come back in the same order as the records, and errors are built the same way either way."""
+    if backend not in SCHEMA_BACKENDS:
+        raise ValueError("Unknown schema backend {}, expected one of {}.".format(backend, SCHEMA_BACKENDS))
+    check = _compile_schema(form)
+
+    if workers is None:
+        passed, failures = _check_records(_record_validator(form, backend), records)
+    else:
+        passed, failures = _check_in_pool(form, records, backend, workers, chunk_size)
+    return BatchResult(check, passed, failures, name)
+
+
+def _record_validator(form, backend):
+    """Build a validate(record) -> bool function for form."""
+    check = _record_checker(form, backend)
+
+    def validate(record):
+        try:
+            check(record)
+        except _SchemaMismatch:
+            return False
+        return True
+    return validate
+
+
+def _check_records(validate, records, offset=0):
+    """Run validate over records, returning the pass/fail bytearray and a dict of index: record for failures."""
+    passed = bytearray()
+    failures = {}
+    for index, record in enumerate(records, offset):
+        if validate(record):
+            passed.append(1)
+        else:
+            passed.append(0)
+            failures[index] = record
+    return passed, failures
+
+
+def _check_in_pool(form, records, backend, workers, chunk_size):
+    """Check records chunk by chunk in a pool of worker processes, merging the results in order.
+    Only a few chunks per worker are in flight at once, so records can be a stream."""
+    if chunk_size < 1:
+        raise ValueError("Expected a chunk_size of at least 1, but got {}.".format(chunk_size))
+    passed = bytearray()
+    failures = {}
+    pending = deque()
+
+    def collect():
+        chunk_passed, chunk_failures = pending.popleft().result()
+        passed.extend(chunk_passed)
+        failures.update(chunk_failures)
+
+    records = iter(records)
+    offset = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_start_worker, initargs=(form, backend)) as executor:
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                break
+            pending.append(executor.submit(_check_chunk, chunk, offset))
+            offset += len(chunk)
+            if len(pending) > 2 * workers:
+                collect()
+        while pending:
+            collect()
+    return passed, failures
+
+
+# The compiled schema, in each worker process.
+_worker_validate = None
+
+
+def _start_worker(form, backend):
+    global _worker_validate
+    _worker_validate = _record_validator(form, backend)
+
+
+def _check_chunk(chunk, offset):
+    return _check_records(_worker_validate, chunk, offset)
+
+
+class BatchResult(object):
+    """The outcome of validate_many.
+
+    passed is a bytearray with a 1 for each record that matched the schema and a 0 for each that didn't.
+    The failing records are kept so that error(index) can build their SchemaError on demand;
+    records that passed aren't kept at all."""
+    def __init__(self, check, passed, failures, name):
+        self.passed = passed
+        self.name = name
+        self._check = check
+        self._failures = failures
+
+    def __len__(self):
+        return len(self.passed)
+
+    def __bool__(self):
+        return not self._failures
+
+    @property
+    def failed_indices(self):
+        """Indices of the records that didn't match, in order."""
+        return sorted(self._failures)
+
+    def error(self, index):
+        """Build the SchemaError for the record at index, or return None if it passed."""
+        if index < 0:
+            index += len(self.passed)
+        if index not in self._failures:
+            return None
+        record = self._failures[index]
+        try:
+            self._check(record)
+        except _SchemaMismatch as mismatch:
+            return mismatch.schema_error(None, record, "{}[{}]".format(self.name, index))
+        # Only reachable if the record was changed after it was validated.
+        return None
+
+    def errors(self):
+        """Yield (index, SchemaError) for each failing record, building each error as it's reached."""
+        for index in self.failed_indices:
+            yield index, self.error(index)
+
+    def raise_first(self):
+        """Raise the SchemaError for the first failing record, if there is one."""
+        for _, error in self.errors():
+            if error is not None:
+                raise error
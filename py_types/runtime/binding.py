@@ -0,0 +1,410 @@
+"""Binding plans shared by the runtime decorators.
+
+A binding plan is worked out once, when a function is decorated.  It holds a compiled checker
+for each annotated parameter and nothing for the rest, so unannotated arguments cost nothing per call.
+
+A checker can also have a `stream` attribute: a stream(value) callable that returns value, or, for iterators,
+a generator checking each item as it's consumed.  Streamed arguments are replaced with the result of stream
+before the checks run, and the checker itself should leave iterators alone.
+
+Coroutine functions get an async wrapper which checks the awaited result, and async generator functions get
+an async generator wrapper which checks each item yielded against the return annotation.  Return annotations of
+AsyncIterator, AsyncIterable or AsyncGenerator describe the generator itself, so its items aren't checked against them."""
+
+import functools
+import inspect
+from collections import namedtuple
+from collections.abc import (
+    AsyncGenerator,
+    AsyncIterable,
+    AsyncIterator,
+)
+
+from .config import metrics_enabled
+from .metrics import function_metrics
+
+
+BindingPlan = namedtuple("BindingPlan", [
+    "positional",  # tuple of (position, name, check) for annotated parameters that can be passed by position
+    "keywords",    # dict of name: check for annotated parameters that can be passed by keyword
+    "varargs",     # (first position, check) for an annotated *args, else None
+    "varkw",       # check for an annotated **kwargs, else None
+    "returns",     # check for the return annotation, else None
+    "streams",     # (tuple of (position, stream), dict of name: stream, (first position, stream) for *args or None,
+                   #  stream for **kwargs or None) for parameters whose checks stream
+])
+
+# Code objects of the wrappers bind_checks returns.  Wrappers are recognised by their code rather than
+# an attribute, since functools.wraps copies attributes onto whatever wraps them in turn.
+_wrapper_codes = set()
+
+# Return annotations of async generator functions that describe the generator rather than each item.
+_ASYNC_ITERATOR_TYPES = (AsyncIterator, AsyncIterable, AsyncGenerator)
+
+
+def build_binding_plan(f, compile_annotation):
+    """Build the BindingPlan for f.
+
+    compile_annotation(name, annotation) should return a check(value) callable that raises
+    when value doesn't match the annotation, or None if there's nothing to check."""
+    try:
+        # Only our own wrappers are looked through: other decorators using functools.wraps may add or drop
+        # arguments, so the signature that matters is the one they're called with.
+        signature = inspect.signature(inspect.unwrap(f, stop=_is_foreign), follow_wrapped=False)
+    except (TypeError, ValueError):
+        return BindingPlan((), {}, None, None, None, ((), {}, None, None))
+
+    def compile_parameter(name, annotation):
+        if annotation is inspect.Parameter.empty:
+            return None
+        return compile_annotation(name, annotation)
+
+    positional = []
+    keywords = {}
+    varargs = None
+    varkw = None
+    streamed_positional = []
+    streamed_keywords = {}
+    streamed_varargs = None
+    streamed_varkw = None
+    position = 0
+    for name, parameter in signature.parameters.items():
+        check = compile_parameter(name, parameter.annotation)
+        stream = getattr(check, "stream", None)
+        if parameter.kind in (parameter.POSITIONAL_ONLY, parameter.POSITIONAL_OR_KEYWORD):
+            if check is not None:
+                positional.append((position, name, check))
+                if parameter.kind == parameter.POSITIONAL_OR_KEYWORD:
+                    keywords[name] = check
+            if stream is not None:
+                streamed_positional.append((position, stream))
+                if parameter.kind == parameter.POSITIONAL_OR_KEYWORD:
+                    streamed_keywords[name] = stream
+            position += 1
+        elif parameter.kind == parameter.KEYWORD_ONLY:
+            if check is not None:
+                keywords[name] = check
+            if stream is not None:
+                streamed_keywords[name] = stream
+        elif parameter.kind == parameter.VAR_POSITIONAL:
+            if check is not None:
+                varargs = (position, check)
+            if stream is not None:
+                streamed_varargs = (position, stream)
+        elif parameter.kind == parameter.VAR_KEYWORD:
+            varkw = check
+            streamed_varkw = stream
+
+    return_annotation = signature.return_annotation
+    if inspect.isasyncgenfunction(f) and return_annotation in _ASYNC_ITERATOR_TYPES:
+        # Annotates the generator itself, which is always one of these, rather than its items.
+        return_annotation = inspect.Parameter.empty
+    returns = compile_parameter("return", return_annotation)
+    return BindingPlan(tuple(positional), keywords, varargs, varkw, returns,
+                       (tuple(streamed_positional), streamed_keywords, streamed_varargs, streamed_varkw))
+
+
+def bind_checks(f, plan, sampling=None):
+    """Wrap f so that every call runs the checks in plan against its arguments and return value.
+
+    If sampling (a config.Sampling) is given, only one call in every sampling.every is checked.
+    If metrics are on (see config.configure), the checks and calls are measured as well."""
+    check_arguments = argument_checker(plan)
+    stream_arguments = argument_streamer(plan)
+    check_return = plan.returns
+    stream_return = getattr(check_return, "stream", None)
+
+    if not metrics_enabled():
+        wrapper = _bind(f, check_arguments, stream_arguments, check_return, stream_return, sampling)
+    else:
+        metrics = function_metrics(f)
+        wrapper = _bind(f, metrics.measure_check(check_arguments), stream_arguments,
+                        metrics.measure_check(check_return), stream_return, sampling)
+        if inspect.iscoroutinefunction(f):
+            wrapper = metrics.measure_coroutine_calls(f, wrapper)
+        elif not inspect.isasyncgenfunction(f):
+            wrapper = metrics.measure_calls(f, wrapper)
+    _wrapper_codes.add(wrapper.__code__)
+    return wrapper
+
+
+def _is_foreign(f):
+    """Whether f isn't one of the wrappers made by bind_checks, for inspect.unwrap to stop at."""
+    return getattr(f, "__code__", None) not in _wrapper_codes
+
+
+def _bind(f, check_arguments, stream_arguments, check_return, stream_return, sampling):
+    """Pick the wrapper for f: async or not, sampled or not, streaming or not."""
+    if inspect.isasyncgenfunction(f) or inspect.iscoroutinefunction(f):
+        sampler = None if sampling is None else Sampler(sampling.every, sampling.adaptive)
+        bind_async = _bind_async_generator if inspect.isasyncgenfunction(f) else _bind_coroutine
+        return bind_async(f, check_arguments, stream_arguments, check_return, stream_return, sampler)
+
+    if sampling is not None:
+        return _sample_checks(f, check_arguments, check_return, Sampler(sampling.every, sampling.adaptive),
+                              stream_arguments, stream_return)
+
+    if stream_arguments is None and stream_return is None:
+        @functools.wraps(f)
+        def checked_function(*args, **kwargs):
+            if check_arguments is not None:
+                check_arguments(args, kwargs)
+
+            result = f(*args, **kwargs)
+
+            if check_return is not None:
+                check_return(result)
+            return result
+        return checked_function
+
+    @functools.wraps(f)
+    def streamed_function(*args, **kwargs):
+        if stream_arguments is not None:
+            args, kwargs = stream_arguments(args, kwargs)
+        if check_arguments is not None:
+            check_arguments(args, kwargs)
+
+        result = f(*args, **kwargs)
+
+        if check_return is not None:
+            check_return(result)
+            if stream_return is not None:
+                result = stream_return(result)
+        return result
+
+    return streamed_function
+
+
+def argument_checker(plan):
+    """Build a check_arguments(args, kwargs) callable running the argument checks in plan,
+    or None if no arguments are checked."""
+    positional, keywords, varargs, varkw = plan.positional, plan.keywords, plan.varargs, plan.varkw
+    check_keywords = bool(keywords) or varkw is not None
+    if not positional and varargs is None and not check_keywords:
+        return None
+
+    def check_arguments(args, kwargs):
+        nargs = len(args)
+        for position, name, check in positional:
+            if position < nargs:
+                check(args[position])
+        if varargs is not None:
+            for arg in args[varargs[0]:]:
+                varargs[1](arg)
+        if check_keywords:
+            for name, arg in kwargs.items():
+                check = keywords.get(name, varkw)
+                if check is not None:
+                    check(arg)
+
+    return check_arguments
+
+
+def argument_streamer(plan):
+    """Build a stream_arguments(args, kwargs) -> (args, kwargs) callable that swaps streamed arguments
+    for their streams, or None if no parameters stream."""
+    positional, keywords, varargs, varkw = plan.streams
+    if not positional and not keywords and varargs is None and varkw is None:
+        return None
+
+    def stream_arguments(args, kwargs):
+        nargs = len(args)
+        for position, stream in positional:
+            if position < nargs:
+                arg = args[position]
+                streamed = stream(arg)
+                if streamed is not arg:
+                    args = args[:position] + (streamed,) + args[position + 1:]
+        if varargs is not None and nargs > varargs[0]:
+            first, stream = varargs
+            args = args[:first] + tuple(stream(arg) for arg in args[first:])
+        if keywords or varkw is not None:
+            for name, arg in kwargs.items():
+                stream = keywords.get(name, varkw)
+                if stream is not None:
+                    kwargs[name] = stream(arg)
+        return args, kwargs
+
+    return stream_arguments
+
+
+class Sampler(object):
+    """Keeps track of how often a sampled function should be checked.
+
+    With adaptive on, every doubles each time `backoff_after` checks in a row have passed,
+    up to `max_factor` times the starting rate, and drops back to the starting rate when a check fails.
+    Threads share a function's sampler without a lock, so under threads the rate and counts are approximate."""
+    backoff_after = 100
+    max_factor = 100
+
+    def __init__(self, every, adaptive=False):
+        self.base_every = every
+        self.every = every
+        self.adaptive = adaptive
+        self.checks = 0
+        self.failures = 0
+        self._passes_in_a_row = 0
+        self._countdown = every
+
+    def due(self):
+        """Count a call, returning whether it should be checked.
+        Sync wrappers keep their countdown in the wrapper instead, which is cheaper."""
+        self._countdown -= 1
+        if self._countdown > 0:
+            return False
+        self._countdown = self.every
+        return True
+
+    def passed(self):
+        self.checks += 1
+        if self.adaptive:
+            self._passes_in_a_row += 1
+            if self._passes_in_a_row >= self.backoff_after:
+                self._passes_in_a_row = 0
+                self.every = min(self.every * 2, self.base_every * self.max_factor)
+
+    def failed(self):
+        self.checks += 1
+        self.failures += 1
+        self._passes_in_a_row = 0
+        self.every = self.base_every
+        self._countdown = self.every
+
+
+def _sample_checks(f, check_arguments, check_return, sampler, stream_arguments=None, stream_return=None):
+    """Wrap f so that only one call in every sampler.every is checked.
+    Skipped calls only cost a countdown on the wrapper."""
+    countdown = sampler.every
+
+    @functools.wraps(f)
+    def sampled_function(*args, **kwargs):
+        nonlocal countdown
+        countdown -= 1
+        if countdown > 0:
+            return f(*args, **kwargs)
+
+        countdown = sampler.every
+        if stream_arguments is not None:
+            args, kwargs = stream_arguments(args, kwargs)
+        if check_arguments is not None:
+            try:
+                check_arguments(args, kwargs)
+            except Exception:
+                sampler.failed()
+                countdown = sampler.every
+                raise
+
+        result = f(*args, **kwargs)
+
+        if check_return is not None:
+            try:
+                check_return(result)
+            except Exception:
+                sampler.failed()
+                countdown = sampler.every
+                raise
+            if stream_return is not None:
+                result = stream_return(result)
+        sampler.passed()
+        countdown = sampler.every
+        return result
+
+    sampled_function.sampler = sampler
+    return sampled_function
+
+
+def _bind_coroutine(f, check_arguments, stream_arguments, check_return, stream_return, sampler):
+    """Wrap the coroutine function f in a coroutine function that checks its arguments and awaited result.
+    The checks run when the coroutine starts, so errors are raised where it's awaited."""
+    @functools.wraps(f)
+    async def checked_coroutine(*args, **kwargs):
+        if sampler is not None and not sampler.due():
+            return await f(*args, **kwargs)
+
+        if stream_arguments is not None:
+            args, kwargs = stream_arguments(args, kwargs)
+        if check_arguments is not None:
+            try:
+                check_arguments(args, kwargs)
+            except Exception:
+                if sampler is not None:
+                    sampler.failed()
+                raise
+
+        result = await f(*args, **kwargs)
+
+        if check_return is not None:
+            try:
+                check_return(result)
+            except Exception:
+                if sampler is not None:
+                    sampler.failed()
+                raise
+            if stream_return is not None:
+                result = stream_return(result)
+        if sampler is not None:
+            sampler.passed()
+        return result
+
+    if sampler is not None:
+        checked_coroutine.sampler = sampler
+    return checked_coroutine
+
+
+# Stands in for the next item once an async generator is exhausted.
+_FINISHED = object()
+
+
+def _bind_async_generator(f, check_arguments, stream_arguments, check_return, stream_return, sampler):
+    """Wrap the async generator function f in one that checks its arguments and each item it yields
+    against the return annotation.  Values sent in with asend() and exceptions thrown in with athrow()
+    are passed on to f's generator, so it can be used under e.g. contextlib.asynccontextmanager."""
+    @functools.wraps(f)
+    async def checked_async_generator(*args, **kwargs):
+        checking = sampler is None or sampler.due()
+        if checking:
+            if stream_arguments is not None:
+                args, kwargs = stream_arguments(args, kwargs)
+            if check_arguments is not None:
+                try:
+                    check_arguments(args, kwargs)
+                except Exception:
+                    if sampler is not None:
+                        sampler.failed()
+                    raise
+
+        check_item = check_return if checking else None
+        items = f(*args, **kwargs)
+        try:
+            try:
+                item = await items.__anext__()
+            except StopAsyncIteration:
+                item = _FINISHED
+            while item is not _FINISHED:
+                if check_item is not None:
+                    try:
+                        check_item(item)
+                    except Exception:
+                        if sampler is not None:
+                            sampler.failed()
+                        raise
+                try:
+                    sent = yield item
+                except GeneratorExit:
+                    raise
+                except BaseException as error:
+                    advance = items.athrow(error)
+                else:
+                    advance = items.asend(sent)
+                try:
+                    item = await advance
+                except StopAsyncIteration:
+                    item = _FINISHED
+        finally:
+            await items.aclose()
+        if checking and sampler is not None:
+            sampler.passed()
+
+    if sampler is not None:
+        checked_async_generator.sampler = sampler
+    return checked_async_generator
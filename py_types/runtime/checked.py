@@ -0,0 +1,67 @@
+"""A single decorator doing the work of both typecheck and schema.
+
+Stacking @typecheck and @schema means two wrappers and two passes over the arguments per call,
+with each layer skipping the annotations it doesn't understand.  checked sorts every annotation
+once, when the function is decorated, and checks all of them in one pass."""
+
+import functools
+from collections.abc import Mapping
+
+from ..type_defs.base import (
+    TypeFamily,
+    ValidatedType,
+)
+from ..validation_cache import resolve_cache
+from .binding import (
+    bind_checks,
+    build_binding_plan,
+)
+from .config import (
+    current_mode,
+    sampling_for,
+)
+from .schema import (
+    SCHEMA_BACKENDS,
+    SchemaAllowExtra,
+    SchemaOr,
+    _schema_checker,
+)
+from .typecheck import (
+    _isinstance_checker,
+    _type_checker,
+)
+
+
+def checked(function=None, *, backend="closures", mode=None, sample=None, adaptive=None, cache=None):
+    """Check a function's arguments and return value against their annotations.
+
+    Each annotation is sorted into one of:
+        plain classes, checked via isinstance, raising a TypeError like typecheck.
+        TypeFamily/ValidatedType classes and instances (e.g. TypedSequence(int)), also checked via isinstance.
+        structural schemas (dicts, lists, tuples, SchemaOr, SchemaAllowExtra), checked like schema, raising a SchemaError.
+    Anything else is ignored, as typecheck and schema would.
+
+    Can be used bare (@checked) or with options; backend and cache are passed on to the schema checks,
+    and mode, sample and adaptive override the settings from runtime.config for this function, as for typecheck."""
+    if backend not in SCHEMA_BACKENDS:
+        raise ValueError("Unknown schema backend {}, expected one of {}.".format(backend, SCHEMA_BACKENDS))
+    resolve_cache(cache)
+    if function is None:
+        return functools.partial(checked, backend=backend, mode=mode, sample=sample, adaptive=adaptive, cache=cache)
+    mode = current_mode(function, mode)
+    if mode == "off":
+        return function
+
+    plan = build_binding_plan(function, functools.partial(_checker, function, backend=backend, cache=cache))
+    return bind_checks(function, plan, sampling_for(mode, sample, adaptive))
+
+
+def _checker(function, name, annotation, backend, cache):
+    """Sort one annotation into the kind of check it needs, and build that check."""
+    if annotation is None or type(annotation) is type:
+        return _type_checker(function, name, annotation)
+    elif isinstance(annotation, type) or isinstance(type(annotation), (TypeFamily, ValidatedType)):
+        return _isinstance_checker(function, name, annotation)
+    elif isinstance(annotation, (SchemaOr, SchemaAllowExtra, Mapping, list, tuple)):
+        return _schema_checker(function, name, annotation, backend, cache)
+    return None
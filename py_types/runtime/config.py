@@ -0,0 +1,117 @@
+"""Settings for the runtime decorators.
+
+The mode decides whether typecheck, schema and checked wrap functions at all:
+    "on" checks every call, as usual.
+    "sample" only checks 1 in every N calls (see configure's sample argument).
+    "off" makes the decorators return the function they were given, unchanged, so checks cost nothing.
+
+The mode and sample rate are read from the PY_TYPES_MODE and PY_TYPES_SAMPLE environment variables
+when py_types is imported, and can be changed with configure().  It can also be overridden for whole modules (configure(modules=...))
+or single functions (e.g. @schema(mode="on")), so a few critical functions can keep their checks in production.
+
+Modes are applied when a function is decorated, so configure() should be called before importing
+the modules whose checks it should affect.
+
+configure(metrics=True), or setting PY_TYPES_METRICS to 1, records how much time is spent checking
+each function decorated from then on (see runtime.metrics)."""
+
+import os
+from collections import namedtuple
+
+
+MODES = ("on", "sample", "off")
+MODE_ENVIRONMENT_VARIABLE = "PY_TYPES_MODE"
+SAMPLE_ENVIRONMENT_VARIABLE = "PY_TYPES_SAMPLE"
+METRICS_ENVIRONMENT_VARIABLE = "PY_TYPES_METRICS"
+
+# How often a sampled function is checked: once every `every` calls.
+# With adaptive, functions whose checks keep passing are checked less and less often.
+Sampling = namedtuple("Sampling", ["every", "adaptive"])
+
+
+def _check_mode(mode):
+    if mode not in MODES:
+        raise ValueError("Unknown py_types mode {}, expected one of {}.".format(mode, MODES))
+    return mode
+
+
+def _check_sample(sample):
+    """Turn a sample rate into a number of calls per check.
+    Rates can be given as an int N, for 1 in N calls, or as a probability between 0 and 1."""
+    if isinstance(sample, str):
+        sample = float(sample) if "." in sample else int(sample)
+    if isinstance(sample, int) and not isinstance(sample, bool) and sample >= 1:
+        return sample
+    if isinstance(sample, float) and 0 < sample <= 1:
+        return max(1, int(round(1 / sample)))
+    raise ValueError("Expected a sample rate of 1 in N calls (an int >= 1) or a probability in (0, 1], but got {}.".format(sample))
+
+
+_settings = {
+    "mode": _check_mode(os.environ.get(MODE_ENVIRONMENT_VARIABLE, "on")),
+    "modules": {},
+    "sample": _check_sample(os.environ.get(SAMPLE_ENVIRONMENT_VARIABLE, 100)),
+    "adaptive": False,
+    "metrics": os.environ.get(METRICS_ENVIRONMENT_VARIABLE, "").lower() in ("1", "true", "on", "yes"),
+}
+
+
+def configure(mode=None, modules=None, sample=None, adaptive=None, metrics=None):
+    """Change the mode of the runtime decorators.
+
+    mode sets the default for every function decorated from now on.
+    modules maps module or package names to a mode for the functions defined in them,
+    e.g. configure(mode="off", modules={"app.payments": "on"}).  Passing None as a module's mode removes its override.
+    sample and adaptive set how functions in "sample" mode are sampled, see sampling_for.
+    metrics turns recording of check counts and timings on or off, see runtime.metrics."""
+    if mode is not None:
+        _settings["mode"] = _check_mode(mode)
+    if sample is not None:
+        _settings["sample"] = _check_sample(sample)
+    if adaptive is not None:
+        _settings["adaptive"] = bool(adaptive)
+    if metrics is not None:
+        _settings["metrics"] = bool(metrics)
+    if modules is not None:
+        for module, module_mode in modules.items():
+            if module_mode is None:
+                _settings["modules"].pop(module, None)
+            else:
+                _settings["modules"][module] = _check_mode(module_mode)
+
+
+def current_mode(function=None, mode=None):
+    """Work out the mode for function.
+
+    A mode given for the function itself wins, then the override for the most specific module
+    or package containing the function, then the global mode."""
+    if mode is not None:
+        return _check_mode(mode)
+
+    module = getattr(function, "__module__", None) or ""
+    best_match = None
+    for name, module_mode in _settings["modules"].items():
+        if module == name or module.startswith(name + "."):
+            if best_match is None or len(name) > len(best_match[0]):
+                best_match = (name, module_mode)
+    if best_match is not None:
+        return best_match[1]
+    return _settings["mode"]
+
+
+def sampling_for(mode, sample=None, adaptive=None):
+    """Work out how a function in the given mode should be sampled, or None to check every call.
+
+    A sample rate given for the function itself turns on sampling even in "on" mode.
+    Otherwise only functions in "sample" mode are sampled, at the configured rate."""
+    if sample is None and mode != "sample":
+        return None
+    every = _settings["sample"] if sample is None else _check_sample(sample)
+    if adaptive is None:
+        adaptive = _settings["adaptive"]
+    return Sampling(every, bool(adaptive))
+
+
+def metrics_enabled():
+    """Whether functions decorated now should record metrics."""
+    return _settings["metrics"]
@@ -0,0 +1,25 @@
+"""Formatting values for error messages."""
+
+import reprlib
+
+
+# Values in error messages are cut down to at most this many characters, so a failure in a large payload
+# is still cheap to report and readable.
+MAX_VALUE_LENGTH = 300
+
+# Containers in error messages show their first few items, nested a few levels deep.
+_value_repr = reprlib.Repr()
+_value_repr.maxlevel = 3
+for _limit in ("maxdict", "maxlist", "maxtuple", "maxset", "maxfrozenset", "maxdeque", "maxarray"):
+    setattr(_value_repr, _limit, 10)
+_value_repr.maxstring = 40
+_value_repr.maxother = 80
+
+
+def summarize(value):
+    """Describe value for an error message, cut down to at most about MAX_VALUE_LENGTH characters.
+    Strings are shown as they are, like str.format would, and other values by their (shortened) repr."""
+    text = value if type(value) is str else _value_repr.repr(value)
+    if len(text) > MAX_VALUE_LENGTH:
+        return text[:MAX_VALUE_LENGTH] + "..."
+    return text
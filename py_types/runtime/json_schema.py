@@ -0,0 +1,289 @@
+"""Translating schemas to and from JSON Schema (draft 2020-12), and saving compiled schemas.
+
+to_json_schema and from_json_schema cover what the two have in common: dict, list, SchemaOr and SchemaAllowExtra
+schemas, and the types JSON data decodes to.  A few things don't translate exactly:
+    - A key is optional in a dict schema when its schema accepts None, while JSON Schema lists required keys.
+      So keys that accept None aren't required in the JSON Schema, and properties that aren't required
+      come back as SchemaOr(schema, type(None)).
+    - int, float and bool are separate in python, where JSON Schema's "integer" doesn't match booleans
+      and "number" matches integers too.  float becomes "number", and "number" comes back as SchemaOr(int, float).
+    - TypeFamily classes become an anyOf of their members, leaving out members JSON data can never be (e.g. complex).
+Anything else, such as ValidatedTypes, JSON Schema keywords without a schema equivalent ("minimum", "$ref", ...),
+or dict keys that aren't strings, raises a ValueError rather than giving a looser schema.
+
+save_compiled_schema writes a schema and its codegen validator, already compiled, to a file that
+load_compiled_schema reads back at startup without generating or compiling anything.
+The file uses pickle and marshal, so only load files you wrote yourself."""
+
+import base64
+import json
+import marshal
+import pickle
+import sys
+from collections.abc import Mapping
+
+from ..type_defs.base import TypeFamily
+from .schema import (
+    SchemaAllowExtra,
+    SchemaOr,
+    _allows_missing,
+    _assert_format_matches,
+    _generated_validators,
+    _is_homogenous_list,
+    _is_leaf,
+    _load_validator,
+    _ValidatorSource,
+    _GENERATED_FILENAME,
+    MAX_GENERATED_VALIDATORS,
+)
+
+
+DRAFT = "https://json-schema.org/draft/2020-12/schema"
+
+# Types JSON data decodes to, and their JSON Schema types.
+# bool comes first since it's a subclass of int.
+_JSON_TYPES = (
+    (bool, "boolean"),
+    (int, "integer"),
+    (float, "number"),
+    (str, "string"),
+    (type(None), "null"),
+    (list, "array"),
+    (dict, "object"),
+)
+
+_SCHEMA_TYPES = {
+    "boolean": bool,
+    "integer": int,
+    "number": SchemaOr(int, float),
+    "string": str,
+    "null": type(None),
+    "array": list,
+    "object": dict,
+}
+
+# Keywords that don't affect validation.
+_ANNOTATION_KEYWORDS = frozenset(["$schema", "$id", "$comment", "title", "description", "default", "examples",
+                                  "deprecated", "readOnly", "writeOnly"])
+
+COMPILED_SCHEMA_FORMAT = 1
+
+
+#--------------------------
+# To JSON Schema
+#--------------------------
+
+
+def to_json_schema(form):
+    """Translate a schema into a JSON Schema document."""
+    document = {"$schema": DRAFT}
+    document.update(_to_json_schema(form))
+    return document
+
+
+def _to_json_schema(form):
+    if isinstance(form, SchemaOr):
+        return {"anyOf": [_to_json_schema(sch) for sch in form.schemas]}
+    elif isinstance(form, SchemaAllowExtra):
+        return _object_schema(form.schema, allow_extra=True)
+    elif _is_leaf(form):
+        return _type_schema(form)
+    elif isinstance(form, Mapping):
+        return _object_schema(form, allow_extra=False)
+    elif _is_homogenous_list(form):
+        return {"type": "array", "items": _to_json_schema(form[0])}
+    return {"type": "array", "prefixItems": [_to_json_schema(sch) for sch in form],
+            "minItems": len(form), "items": False}
+
+
+def _object_schema(form, allow_extra):
+    for key in form:
+        if not isinstance(key, str):
+            raise ValueError("JSON objects can only have string keys, but the schema has key {!r}.".format(key))
+    document = {
+        "type": "object",
+        "properties": {key: _to_json_schema(value) for key, value in form.items()},
+        "required": [key for key, value in form.items() if not _allows_missing(value)],
+    }
+    if not allow_extra:
+        document["additionalProperties"] = False
+    return document
+
+
+def _type_schema(form):
+    if form is object:
+        return {}
+    for python_type, json_type in _JSON_TYPES:
+        if form is python_type:
+            return {"type": json_type}
+    if isinstance(form, TypeFamily):
+        members = []
+        for member in form._members:
+            try:
+                members.append(_type_schema(member))
+            except ValueError:
+                pass
+        if members:
+            return members[0] if len(members) == 1 else {"anyOf": members}
+    raise ValueError("{!r} has no JSON Schema equivalent.".format(form))
+
+
+#--------------------------
+# From JSON Schema
+#--------------------------
+
+
+def from_json_schema(document):
+    """Translate a JSON Schema document into a schema."""
+    if document is True:
+        return object
+    if not isinstance(document, Mapping):
+        raise ValueError("Expected a JSON Schema object, but got {!r}.".format(document))
+
+    keywords = set(document) - _ANNOTATION_KEYWORDS
+    alternatives = []
+    if "anyOf" in document or "oneOf" in document:
+        key = "anyOf" if "anyOf" in document else "oneOf"
+        keywords.discard(key)
+        alternatives.append(SchemaOr(*[from_json_schema(sub) for sub in document[key]]))
+
+    if "type" in document:
+        keywords.discard("type")
+        types = document["type"] if isinstance(document["type"], list) else [document["type"]]
+        typed = []
+        for json_type in types:
+            if json_type == "object":
+                typed.append(_from_object_schema(document, keywords))
+            elif json_type == "array":
+                typed.append(_from_array_schema(document, keywords))
+            elif json_type in _SCHEMA_TYPES:
+                typed.append(_SCHEMA_TYPES[json_type])
+            else:
+                raise ValueError("Unknown JSON Schema type {!r}.".format(json_type))
+        alternatives.append(typed[0] if len(typed) == 1 else SchemaOr(*typed))
+
+    if keywords:
+        raise ValueError("JSON Schema keywords {} have no schema equivalent.".format(sorted(keywords)))
+    if not alternatives:
+        return object
+    if len(alternatives) > 1:
+        raise ValueError("Can't combine 'type' with 'anyOf' or 'oneOf'.")
+    return alternatives[0]
+
+
+def _from_object_schema(document, keywords):
+    keywords.difference_update(["properties", "required", "additionalProperties"])
+    properties = document.get("properties", {})
+    required = set(document.get("required", ()))
+    unknown = required - set(properties)
+    if unknown:
+        raise ValueError("Required keys {} have no properties.".format(sorted(unknown)))
+    form = {}
+    for key, sub in properties.items():
+        value = from_json_schema(sub)
+        if key not in required and not _allows_missing(value):
+            value = SchemaOr(value, type(None))
+        form[key] = value
+
+    extra = document.get("additionalProperties", True)
+    if extra is False:
+        return form
+    if extra is not True and extra != {}:
+        raise ValueError("additionalProperties can only be true or false, not {!r}.".format(extra))
+    if not properties:
+        return dict
+    return SchemaAllowExtra(form)
+
+
+def _from_array_schema(document, keywords):
+    keywords.difference_update(["items", "prefixItems", "minItems"])
+    if "prefixItems" in document:
+        prefix = document["prefixItems"]
+        if document.get("items", True) is not False or document.get("minItems", 0) != len(prefix):
+            raise ValueError("prefixItems are only supported with \"items\": false and minItems of the same length.")
+        return [from_json_schema(sub) for sub in prefix]
+    if "minItems" in document:
+        raise ValueError("minItems is only supported along with prefixItems.")
+    if "items" in document:
+        return [from_json_schema(document["items"])]
+    return list
+
+
+#--------------------------
+# Compiled schemas
+#--------------------------
+
+
+class CompiledSchema(object):
+    """A schema along with its codegen validator.
+
+    form can be used as an annotation, and @schema(backend="codegen") will use this validator for it
+    instead of generating a new one."""
+    def __init__(self, form, validator):
+        self.form = form
+        self.validator = validator
+        if len(_generated_validators) >= MAX_GENERATED_VALIDATORS:
+            _generated_validators.clear()
+        _generated_validators[id(form)] = (form, validator)
+
+    def matches(self, data):
+        """Whether data matches the schema."""
+        return self.validator(data)
+
+    def validate(self, data, name="data"):
+        """Raise a SchemaError if data doesn't match the schema, and return it otherwise."""
+        if not self.validator(data):
+            _assert_format_matches(self.form, data, name=name)
+        return data
+
+
+def save_compiled_schema(form, path):
+    """Generate and compile form's codegen validator, and write both to path as JSON.
+    The JSON Schema for form is included too, when it has one."""
+    source = _ValidatorSource()
+    name = source.function(form, nested=False)
+    text = source.text()
+    code = compile(text, _GENERATED_FILENAME, "exec")
+    try:
+        json_schema = to_json_schema(form)
+    except ValueError:
+        json_schema = None
+
+    artifact = {
+        "py_types_compiled_schema": COMPILED_SCHEMA_FORMAT,
+        "cache_tag": sys.implementation.cache_tag,
+        "json_schema": json_schema,
+        "form": _encode(pickle.dumps(form)),
+        "constants": _encode(pickle.dumps(source.constants)),
+        "name": name,
+        "source": text,
+        "code": _encode(marshal.dumps(code)),
+    }
+    with open(path, "w") as f:
+        json.dump(artifact, f, indent=2)
+    return CompiledSchema(form, _load_validator(code, source.constants, name, text))
+
+
+def load_compiled_schema(path):
+    """Load a CompiledSchema saved by save_compiled_schema.
+    If it was compiled by another python version, the validator is compiled again from its source."""
+    with open(path) as f:
+        artifact = json.load(f)
+    if artifact.get("py_types_compiled_schema") != COMPILED_SCHEMA_FORMAT:
+        raise ValueError("{} isn't a compiled schema this version of py_types can read.".format(path))
+
+    form = pickle.loads(_decode(artifact["form"]))
+    constants = pickle.loads(_decode(artifact["constants"]))
+    if artifact["cache_tag"] == sys.implementation.cache_tag:
+        code = marshal.loads(_decode(artifact["code"]))
+    else:
+        code = compile(artifact["source"], _GENERATED_FILENAME, "exec")
+    return CompiledSchema(form, _load_validator(code, constants, artifact["name"], artifact["source"]))
+
+
+def _encode(data):
+    return base64.b64encode(data).decode("ascii")
+
+
+def _decode(text):
+    return base64.b64decode(text.encode("ascii"))
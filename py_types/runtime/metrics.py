@@ -0,0 +1,230 @@
+"""Metrics on how much time the runtime decorators spend checking.
+
+Turned on with configure(metrics=True) or the PY_TYPES_METRICS environment variable, and, like modes,
+applied when a function is decorated.  Functions decorated while metrics are off pay nothing for them.
+
+For each decorated function this records:
+    calls: how many times it was called.
+    checks: how many times its arguments or return value were checked (two per call when both are checked,
+        fewer when it's sampled).
+    failures: how many of those checks raised.
+    validation_ns and body_ns: total time spent checking, and in the rest of the call.
+        For coroutine functions the body time includes time spent waiting.
+        Async generators only record checks, failures and validation time.
+    Percentiles of the validation and body time per call, over the most recent calls.
+
+Each thread records into its own accumulator, so recording takes no locks.
+Accumulators are only combined when a snapshot is taken."""
+
+import functools
+import json
+import threading
+from time import perf_counter_ns
+
+
+# Per-call times kept, per function per thread, for working out percentiles.
+RECENT_SAMPLES = 1024
+
+PERCENTILES = (50, 90, 99)
+
+# Metrics for each decorated function, by its module-qualified name.
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+class _Accumulator(object):
+    """One thread's metrics for one function.  Only ever written to by that thread."""
+    __slots__ = ("calls", "checks", "failures", "validation_ns", "body_ns",
+                 "validation_samples", "body_samples", "next_sample")
+
+    def __init__(self):
+        self.calls = 0
+        self.checks = 0
+        self.failures = 0
+        self.validation_ns = 0
+        self.body_ns = 0
+        self.validation_samples = []
+        self.body_samples = []
+        self.next_sample = 0
+
+    def record_call(self, validation_ns, body_ns):
+        self.calls += 1
+        self.body_ns += body_ns
+        if len(self.body_samples) < RECENT_SAMPLES:
+            self.validation_samples.append(validation_ns)
+            self.body_samples.append(body_ns)
+        else:
+            self.validation_samples[self.next_sample] = validation_ns
+            self.body_samples[self.next_sample] = body_ns
+            self.next_sample = (self.next_sample + 1) % RECENT_SAMPLES
+
+
+class FunctionMetrics(object):
+    """Metrics for one decorated function, made of one accumulator per thread that has called it."""
+    def __init__(self, name):
+        self.name = name
+        self._local = threading.local()
+        self._accumulators = []
+        self._lock = threading.Lock()
+
+    def accumulator(self):
+        """Get the calling thread's accumulator."""
+        try:
+            return self._local.accumulator
+        except AttributeError:
+            accumulator = self._local.accumulator = _Accumulator()
+            with self._lock:
+                self._accumulators.append(accumulator)
+            return accumulator
+
+    def measure_check(self, check):
+        """Wrap a check so that it counts towards checks, failures and validation time."""
+        if check is None:
+            return None
+
+        @functools.wraps(check)
+        def measured_check(*args):
+            accumulator = self.accumulator()
+            accumulator.checks += 1
+            start = perf_counter_ns()
+            try:
+                return check(*args)
+            except Exception:
+                accumulator.failures += 1
+                raise
+            finally:
+                accumulator.validation_ns += perf_counter_ns() - start
+
+        return measured_check
+
+    def measure_calls(self, f, wrapper):
+        """Wrap the checked wrapper of f so that calls and body time are recorded."""
+        @functools.wraps(wrapper)
+        def measured_function(*args, **kwargs):
+            accumulator = self.accumulator()
+            validation_before = accumulator.validation_ns
+            start = perf_counter_ns()
+            try:
+                return wrapper(*args, **kwargs)
+            finally:
+                elapsed = perf_counter_ns() - start
+                validation = accumulator.validation_ns - validation_before
+                accumulator.record_call(validation, elapsed - validation)
+
+        measured_function.__wrapped__ = f
+        return measured_function
+
+    def measure_coroutine_calls(self, f, wrapper):
+        """The same as measure_calls, for coroutine functions."""
+        @functools.wraps(wrapper)
+        async def measured_coroutine(*args, **kwargs):
+            accumulator = self.accumulator()
+            validation_before = accumulator.validation_ns
+            start = perf_counter_ns()
+            try:
+                return await wrapper(*args, **kwargs)
+            finally:
+                elapsed = perf_counter_ns() - start
+                validation = accumulator.validation_ns - validation_before
+                accumulator.record_call(validation, elapsed - validation)
+
+        measured_coroutine.__wrapped__ = f
+        return measured_coroutine
+
+    def snapshot(self):
+        """Combine the accumulators into a dict of totals and percentiles."""
+        with self._lock:
+            accumulators = list(self._accumulators)
+
+        totals = {"calls": 0, "checks": 0, "failures": 0, "validation_ns": 0, "body_ns": 0}
+        validation_samples = []
+        body_samples = []
+        for accumulator in accumulators:
+            for key in totals:
+                totals[key] += getattr(accumulator, key)
+            validation_samples.extend(accumulator.validation_samples)
+            body_samples.extend(accumulator.body_samples)
+
+        validation_samples.sort()
+        body_samples.sort()
+        for percentile in PERCENTILES:
+            totals["validation_p{}_ns".format(percentile)] = _percentile(validation_samples, percentile)
+            totals["body_p{}_ns".format(percentile)] = _percentile(body_samples, percentile)
+        return totals
+
+
+def _percentile(ordered, percentile):
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, len(ordered) * percentile // 100)]
+
+
+def function_metrics(f):
+    """Get the FunctionMetrics for f, creating it if needed.
+    Functions with the same module and qualified name (e.g. when decorated again) share their metrics."""
+    name = "{}.{}".format(getattr(f, "__module__", None), getattr(f, "__qualname__", repr(f)))
+    with _registry_lock:
+        metrics = _registry.get(name)
+        if metrics is None:
+            metrics = _registry[name] = FunctionMetrics(name)
+    return metrics
+
+
+def snapshot():
+    """Get the metrics of every function decorated while metrics were on, as a dict keyed by function name."""
+    with _registry_lock:
+        registered = list(_registry.values())
+    return {metrics.name: metrics.snapshot() for metrics in registered}
+
+
+def reset():
+    """Forget all metrics recorded so far.  Functions keep recording from zero."""
+    with _registry_lock:
+        registered = list(_registry.values())
+    for metrics in registered:
+        with metrics._lock:
+            metrics._accumulators = []
+            metrics._local = threading.local()
+
+
+def to_json(**kwargs):
+    """Dump snapshot() as JSON.  kwargs are passed on to json.dumps."""
+    return json.dumps(snapshot(), **kwargs)
+
+
+def to_prometheus():
+    """Dump snapshot() in the Prometheus text exposition format."""
+    metrics = snapshot()
+    lines = []
+
+    def family(name, kind, description, samples):
+        lines.append("# HELP {} {}".format(name, description))
+        lines.append("# TYPE {} {}".format(name, kind))
+        for labels, value in samples:
+            rendered = ",".join('{}="{}"'.format(key, _escape_label(label)) for key, label in labels)
+            lines.append("{}{{{}}} {}".format(name, rendered, value))
+
+    def seconds(value):
+        return "NaN" if value is None else repr(value / 1e9)
+
+    family("py_types_checks_total", "counter", "Argument and return value checks run.",
+           [((("function", name),), stats["checks"]) for name, stats in metrics.items()])
+    family("py_types_failures_total", "counter", "Checks that failed.",
+           [((("function", name),), stats["failures"]) for name, stats in metrics.items()])
+    for part, description in [("validation", "Time spent checking, per call."),
+                              ("body", "Time spent in the rest of the call, per call.")]:
+        samples = []
+        for name, stats in metrics.items():
+            for percentile in PERCENTILES:
+                labels = (("function", name), ("quantile", str(percentile / 100)))
+                samples.append((labels, seconds(stats["{}_p{}_ns".format(part, percentile)])))
+        family("py_types_{}_seconds".format(part), "summary", description, samples)
+        for name, stats in metrics.items():
+            labels = 'function="{}"'.format(_escape_label(name))
+            lines.append("py_types_{}_seconds_sum{{{}}} {}".format(part, labels, seconds(stats["{}_ns".format(part)])))
+            lines.append("py_types_{}_seconds_count{{{}}} {}".format(part, labels, stats["calls"]))
+    return "\n".join(lines) + "\n"
+
+
+def _escape_label(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
@@ -17,13 +17,44 @@ Currently known possible pitfalls:
     Other Iterable type objects will be ignored unless they return true for isinstance(instance, list).
 
 - The code for checking a schema list _is_ dependent on order.  The order of the arguments must match the order declared
-    in the schema.  This seems generally desirable to me at the moment, but note that there is no alternative."""
+    in the schema.  This seems generally desirable to me at the moment, but note that there is no alternative.
+
+ON ITERATORS:
+An iterator or generator given for a homogenous list schema (a list with one member) isn't consumed up front.
+Instead, the function is passed a generator that checks each item as it is taken, and raises a SchemaError
+at the first bad item.  The same goes for iterators returned from a function with such a return annotation.
+Async iterators get an async generator doing the same.
+Heterogenous list schemas need to know the data's length, so they can't be streamed.
+
+ON TRACKED DATA:
+Dicts and lists from runtime.tracked.track remember the compiled schemas they've passed, so passing the same
+data through several checked functions only re-checks the parts written to in between."""
 
 
 import functools
-from collections import Iterable
+import math
+from collections.abc import (
+    AsyncIterator,
+    Iterable,
+    Iterator,
+    Mapping,
+)
 import sys
-from copy import copy
+
+from .binding import (
+    bind_checks,
+    build_binding_plan,
+)
+from .config import (
+    current_mode,
+    sampling_for,
+)
+from .tracked import (
+    TrackedDict,
+    TrackedList,
+)
+from ..validation_cache import resolve_cache
+from .formatting import summarize
 
 #--------------------------
 # Types
@@ -31,158 +62,377 @@ from copy import copy
 
 class SchemaOr(object):
     """A class that allows you to allow a value as long as any of the given schemas are valid.
-    Logic handling this class specifically is in _assert_format_matches."""
+    Logic handling this class specifically is in _compile_or."""
     def __init__(self, *annotations):
         self.schemas = annotations
 
 
+class SchemaAllowExtra(object):
+    """A class that allows a dict to have keys that aren't in its schema.
+    The keys that are in the schema are still checked as usual."""
+    def __init__(self, annotation):
+        if not isinstance(annotation, Mapping):
+            raise TypeError("SchemaAllowExtra expects a dict schema, but got value {} of type {}.".format(annotation, type(annotation)))
+        self.schema = annotation
+
+
 #--------------------------
 # Main checking functions
 #--------------------------
 
 
-def schema(function):
-    """Check that a function's arguments match the given schemas."""
+SCHEMA_BACKENDS = ("closures", "codegen")
+
+
+def schema(function=None, *, backend="closures", mode=None, sample=None, adaptive=None, cache=None):
+    """Check that a function's arguments match the given schemas.
+
+    Annotations are compiled into checkers once, when the function is decorated,
+    so each call only has to check the data.
+
+    Can be used bare (@schema) or with options (@schema(backend="codegen")).
+    backend picks how the schemas are compiled:
+        "closures" builds a tree of checker closures.
+        "codegen" generates flat python source for each schema and compiles it,
+            falling back to the closures only to report errors when the data doesn't match.
+    mode overrides the mode from runtime.config for this function; with "off", the function is returned unchanged.
+    sample and adaptive control sampling, as for typecheck.
+    cache, a py_types.validation_cache.ValidationCache (or True for the default one), remembers immutable
+    arguments (e.g. tuples of tuples) that have already passed, so passing the same ones again costs a lookup."""
+    if backend not in SCHEMA_BACKENDS:
+        raise ValueError("Unknown schema backend {}, expected one of {}.".format(backend, SCHEMA_BACKENDS))
+    resolve_cache(cache)
+    if function is None:
+        return functools.partial(schema, backend=backend, mode=mode, sample=sample, adaptive=adaptive, cache=cache)
+    mode = current_mode(function, mode)
+    if mode == "off":
+        return function
+
+    plan = build_binding_plan(function, functools.partial(_schema_checker, function, backend=backend, cache=cache))
+    return bind_checks(function, plan, sampling_for(mode, sample, adaptive))
+
+
+def _schema_checker(function, name, form, backend, cache=None):
+    """Build the check(arg) callable for one annotated argument, which raises a SchemaError on bad data.
+    Returns None if the annotation is None, since there is nothing to check."""
+    if form is None:
+        return None
+    check_form = _compile_schema(form)
+
+    def check_schema(arg):
+        try:
+            check_form(arg)
+        except _SchemaMismatch as mismatch:
+            raise mismatch.schema_error(function, arg, name) from None
+
+    check = check_schema
+    if backend == "codegen":
+        matches = _generate_validator(form)
+
+        def check_generated(arg):
+            # Tracked data goes to the closures, which can skip the parts that haven't changed.
+            if type(arg) is TrackedDict or type(arg) is TrackedList or not matches(arg):
+                check_schema(arg)
+        check = check_generated
+
+    cache = resolve_cache(cache)
+    if cache is not None:
+        check_uncached = check
+
+        # Entries are keyed by the compiled checker, which every function using this schema shares.
+        def check_cached(arg):
+            if not cache.passed(check_form, arg):
+                check_uncached(arg)
+                cache.add(check_form, arg)
+        check = check_cached
+
+    if not _is_homogenous_list(form):
+        return check
+
+    # Iterators are left to the stream, which the binding swaps in for them before checking.
+    check_item = _compile_schema(form[0])
+
+    def check_or_stream(arg):
+        if type(arg) is list or not isinstance(arg, (Iterator, AsyncIterator)):
+            check(arg)
+
+    def stream(arg):
+        if type(arg) is list:
+            return arg
+        if isinstance(arg, Iterator):
+            return _validate_stream(check_item, arg, function, name)
+        if isinstance(arg, AsyncIterator):
+            return _validate_async_stream(check_item, arg, function, name)
+        return arg
+
+    check_or_stream.stream = stream
+    return check_or_stream
+
+
+def _record_checker(form, backend):
+    """Compile form into a checker raising _SchemaMismatch, using the generated validator first with "codegen"."""
+    if backend not in SCHEMA_BACKENDS:
+        raise ValueError("Unknown schema backend {}, expected one of {}.".format(backend, SCHEMA_BACKENDS))
+    check = _compile_schema(form)
+    if backend == "codegen":
+        matches = _generate_validator(form)
+
+        def check_generated(record):
+            if not matches(record):
+                check(record)
+        return check_generated
+    return check
+
+
+def _validate_stream(check_item, items, function=None, name="data", start=0):
+    """Yield each of items, first checking it with check_item (a compiled checker).
+    Raises a SchemaError for the first item that doesn't match; its key path starts with the item's index.
+    Only the current item is held, so this works on streams of any length."""
+    for index, item in enumerate(items, start):
+        try:
+            check_item(item)
+        except _SchemaMismatch as mismatch:
+            mismatch.path.append(index)
+            raise mismatch.schema_error(function, items, name) from None
+        yield item
+
+
+async def _validate_async_stream(check_item, items, function=None, name="data"):
+    """The same as _validate_stream, for async iterators."""
+    index = 0
+    async for item in items:
+        try:
+            check_item(item)
+        except _SchemaMismatch as mismatch:
+            mismatch.path.append(index)
+            raise mismatch.schema_error(function, items, name) from None
+        yield item
+        index += 1
+
+
+def _assert_format_matches(form, data, function=None, name="data"):
+    """Checks that for each key value pair in form,
+    there is a matching one in data where the value is the type
+    specified in form.  Raises a SchemaError if not."""
+    try:
+        _compile_schema(form)(data)
+    except _SchemaMismatch as mismatch:
+        raise mismatch.schema_error(function, data, name) from None
+    return data
 
-    @functools.wraps(function)
-    def validated_function(*args, **kwargs):
-        for i, arg in enumerate(args[:function.__code__.co_nlocals]):
-            _validate_schema(function, function.__code__.co_varnames[i], arg)
-        for name, arg in kwargs.items():
-            _validate_schema(function, name, arg)
 
-        result = function(*args, **kwargs)
+#--------------------------
+# Schema compilation
+#--------------------------
 
-        _validate_schema(function, 'return', result)
-        return result
 
-    return validated_function
+def _is_leaf(form):
+    """Leaf schemas are the ones passed straight to isinstance."""
+    return not isinstance(form, (SchemaOr, SchemaAllowExtra)) and (isinstance(form, type) or isinstance(form, str) or not isinstance(form, Iterable))
 
 
-def _validate_schema(f, name, arg):
-    ann_schema = f.__annotations__.get(name, None)
-    if ann_schema is not None:
-        custom_raise = functools.partial(_assert_or_raise, f, arg, name)
-        _assert_format_matches(ann_schema, arg, custom_raise)
+def _is_homogenous_list(form):
+    """Whether form is a list schema with one member, which any number of items can match."""
+    return (not _is_leaf(form) and not isinstance(form, (SchemaOr, SchemaAllowExtra, Mapping))
+            and len(form) == 1)
 
 
-def _assert_format_matches(form, data, assert_raise, key_path=None):
-    """Checks that for each key value pair in form,
-    there is a matching one in data where the value is the type
-    specified in form."""
-    if key_path is None:
-        key_path = []
-    is_dict = True
+# Compiled checkers, keyed by id() of the schema they were built from and whether it was nested.
+# The schema itself is kept alongside so that its id can't be reused.  Sharing checkers between
+# functions using the same schema lets tracked data (see runtime.tracked) skip checks across them.
+# Entries are published once (see _publish) and never changed, so they're read without a lock.
+_compiled_checkers = {}
 
-    try:
-        form_items = form.items()
-        assert_raise(isinstance(data, dict), key_path, data, dict)
-    except AttributeError: # non-dictionary cases
-        if isinstance(form, SchemaOr):
-            reasons = []
-            for i, sch in enumerate(form.schemas):
-                or_key_path = copy(key_path)
-                or_key_path.append(i)
-                try:
-                    _assert_format_matches(sch, data, assert_raise, or_key_path)
-                except SchemaError as schema_err:
-                    reasons.append(schema_err.args[0])
-                if len(reasons) != i + 1:
-                    break
-
-            if len(reasons) == len(form.schemas):
-                message = "  SchemaOr failed to validate for any schema, with these reasons:\n  "
-                message = message + "\n  ".join(reasons)
-                # Just want it to throw the error with function/arg name info, so we pass False
-                assert_raise(False, key_path, data, form, message=message)
-            return
+# Past this many, the compiled checkers are dropped and built again as needed.
+MAX_COMPILED_CHECKERS = 4096
 
-        elif not isinstance(form, Iterable) or isinstance(form, str):
-            assert_raise(isinstance(data, form), key_path, data, form)
-            return
 
-        else:
-            assert_raise(isinstance(data, Iterable), key_path, data, form)
-            if len(form) == 1:
-                for ind, item in enumerate(data):
-                    ind_key_path = copy(key_path)
-                    ind_key_path.append(ind)
-                    _assert_format_matches(form[0], item, assert_raise, ind_key_path)
-                return
-            else:
-                form_items = form
-                is_dict = False
-    except TypeError:
-        # This is raised from form.items() when form is explicity the class 'dict', in which case this is all we can check.
-        assert_raise(isinstance(data, dict), key_path, data, dict)
-        return
+def _compile_schema(form, nested=False):
+    """Turn a schema into a checker closure with the signature check(data).
 
-    if is_dict:
-        _check_values_dict(form_items, data, assert_raise, key_path)
-    else:
-        _check_values_list(form_items, data, assert_raise, key_path)
+    The shape of the schema is decided here, once, so that the returned checker only has to look at the data.
+    Checkers return None when the data matches and raise a _SchemaMismatch when it doesn't.
+    nested is True when form is a value inside a dict or heterogenous list schema; lists found there
+    only accept lists and tuples, while top-level lists accept any iterable.
 
-    return data
+    Checkers are cached per schema object, so schemas shouldn't be changed once they've been used."""
+    key = (id(form), nested)
+    cached = _compiled_checkers.get(key)
+    if cached is not None and cached[0] is form:
+        return cached[1]
+
+    if isinstance(form, SchemaOr):
+        check = _compile_or(form)
+    elif isinstance(form, SchemaAllowExtra):
+        check = _compile_dict(form.schema, allow_extra=True)
+    elif _is_leaf(form):
+        check = _compile_leaf(form)
+    elif isinstance(form, Mapping):
+        check = _compile_dict(form)
+    elif _is_homogenous_list(form):
+        check = _compile_homogenous_list(form, nested)
+    else:
+        check = _compile_heterogenous_list(form, nested)
+
+    if len(_compiled_checkers) >= MAX_COMPILED_CHECKERS:
+        _compiled_checkers.clear()
+    return _publish(_compiled_checkers, key, form, check)
+
+
+def _publish(registry, key, form, value):
+    """Store (form, value) in registry under key, unless another thread got there first.
+    Returns the value that ended up stored, so that threads racing to build the same thing all use one of them.
+    Readers only ever see complete entries, since each is an immutable tuple set with a single dict operation."""
+    published = registry.setdefault(key, (form, value))
+    if published[0] is not form:
+        published = registry[key] = (form, value)
+    return published[1]
+
+
+def _compile_leaf(form):
+    """Leaf schemas (types, custom types) are checked directly via isinstance."""
+    def check_leaf(data):
+        if not isinstance(data, form):
+            raise _SchemaMismatch(data, form)
+    return check_leaf
+
+
+def _compile_or(form):
+    """A SchemaOr passes as soon as one of its schemas passes.
+
+    Alternatives are grouped by what they can match, so only plausible ones are tried:
+    leaf types are all checked at once with a single isinstance against a tuple of them,
+    dict schemas are only tried on dicts, and list schemas only on iterables.
+    Why each alternative failed is only worked out once all of them have."""
+    checkers = tuple(_compile_schema(sch) for sch in form.schemas)
+    leaves, dicts, lists, others = _group_alternatives(form.schemas)
+    leaves = tuple(form.schemas[i] for i in leaves)
+    dict_checkers = tuple(checkers[i] for i in dicts)
+    list_checkers = tuple(checkers[i] for i in lists)
+    other_checkers = tuple(checkers[i] for i in others)
+
+    def check_or(data):
+        if leaves and isinstance(data, leaves):
+            return
+        if dict_checkers and isinstance(data, dict):
+            for check in dict_checkers:
+                try:
+                    check(data)
+                    return
+                except _SchemaMismatch:
+                    pass
+        if list_checkers and isinstance(data, Iterable):
+            for check in list_checkers:
+                try:
+                    check(data)
+                    return
+                except _SchemaMismatch:
+                    pass
+        for check in other_checkers:
+            try:
+                check(data)
+                return
+            except _SchemaMismatch:
+                pass
+        reasons = []
+        for check in checkers:
+            try:
+                check(data)
+            except _SchemaMismatch as mismatch:
+                reasons.append(mismatch)
+        raise _SchemaMismatch(data, form, "or", reasons)
+    return check_or
+
+
+def _group_alternatives(schemas):
+    """Sort the indices of a SchemaOr's schemas into (leaves, dicts, lists, others), each in their original order.
+    leaves are the ones isinstance accepts, dicts the dict schemas, lists the list schemas,
+    and others anything else (nested SchemaOrs, leaves isinstance would reject)."""
+    leaves, dicts, lists, others = [], [], [], []
+    for i, sch in enumerate(schemas):
+        if isinstance(sch, SchemaOr):
+            others.append(i)
+        elif isinstance(sch, (Mapping, SchemaAllowExtra)):
+            dicts.append(i)
+        elif not _is_leaf(sch):
+            lists.append(i)
+        else:
+            try:
+                isinstance(None, sch)
+            except TypeError:
+                others.append(i)
+            else:
+                leaves.append(i)
+    return leaves, dicts, lists, others
 
 
-def _check_values_dict(form_items, data, assert_raise, key_path):
+def _compile_dict(form, allow_extra=False):
     """Comparison logic for dictionary schemas.
     Checks the key exists in the data,
     Recurses on dicts and lists,
     and otherwise just checks the value to the form_item's value via isinstance.
 
-    Also checks to be sure that all keys in the data source exist in form_items."""
-    for key, value in form_items:
+    Unless allow_extra is set, also checks to be sure that all keys in the data source exist in the form."""
+    form_items = tuple((key, value, _compile_schema(value, nested=True), _allows_missing(value))
+                       for key, value in form.items())
+    allowed = frozenset(form.keys())
 
-        if key not in data:
-            if isinstance(value, SchemaOr):
-                _call_assert_raise_no_key(assert_raise, type(None) in value.schemas, key, key_path, data, value)
+    def check_dict(data):
+        if not isinstance(data, dict):
+            raise _SchemaMismatch(data, dict)
+        tracked = type(data) is TrackedDict
+        if tracked and check_dict in data._valid_for:
+            return
+
+        for key, value, check, allows_missing in form_items:
+            if key not in data:
+                if not allows_missing:
+                    raise _SchemaMismatch(data, value, "missing_key", key)
             else:
                 try:
-                    _call_assert_raise_no_key(assert_raise, isinstance(None, value), key, key_path, data, value)
-                except TypeError:
-                    _call_assert_raise_no_key(assert_raise, isinstance(None, type(value)), key, key_path, data, value)
-
-        elif isinstance(value, SchemaOr):
-            key_path.append(key)
-            _assert_format_matches(value, data[key], assert_raise, key_path)
-
-        elif isinstance(value, dict):
-            key_path.append(key)
-            assert_raise(isinstance(data[key], dict), key_path, data[key], dict)
-            _assert_format_matches(value, data[key], assert_raise, key_path)
-
-        elif isinstance(value, (list, tuple)):
-            key_path.append(key)
-            assert_raise(isinstance(data[key], (list, tuple)), key_path, data[key], (list, tuple))
-            # If one item is in the list, assume its homogenous and any length is okay.
-            if len(data[key]) == 1:
-                for i, item in enumerate(data[key]):
-                    ind_key_path = copy(key_path)
-                    ind_key_path.append(i)
-                    _assert_format_matches(value[0], item, assert_raise, ind_key_path)
-            else:
-                _assert_format_matches(value, data[key], assert_raise, key_path)
-
-        else:
-            item_key_path = copy(key_path)
-            item_key_path.append(key)
-            assert_raise(isinstance(data[key], value), item_key_path, data[key], value)
-
-    for key in data.keys():
-        form_keys = [items[0] for items in form_items]
-        assert_raise(key in form_keys,
-                     key_path,
-                     data,
-                     form_items,
-                     message="did not expect key {} in ".format(key) + "{name}" + " with value {}".format(data[key])
-                     + "; key was not specified in schema.")
-
-
-def _check_values_list(form_items, data, assert_raise, key_path):
-    """Comparison logic for list schemas.
+                    check(data[key])
+                except _SchemaMismatch as mismatch:
+                    mismatch.path.append(key)
+                    raise
+
+        if not allow_extra and not allowed.issuperset(data):
+            extra = data.keys() - allowed
+            key = next(key for key in data if key in extra)
+            raise _SchemaMismatch(data, form, "extra_key", key)
+        if tracked:
+            data._valid_for.add(check_dict)
+    return check_dict
+
+
+def _compile_homogenous_list(form, nested):
+    """If one item is in the list, assume its homogenous and any length is okay,
+    as long as every item matches the schema's only member."""
+    check_item = _compile_schema(form[0])
+    expected = (list, tuple) if nested else Iterable
+    reported = expected if nested else form
+
+    def check_homogenous_list(data):
+        if not isinstance(data, expected):
+            raise _SchemaMismatch(data, reported)
+        tracked = type(data) is TrackedList
+        if tracked and check_homogenous_list in data._valid_for:
+            return
+        index = 0
+        try:
+            for item in data:
+                check_item(item)
+                index += 1
+        except _SchemaMismatch as mismatch:
+            mismatch.path.append(index)
+            raise
+        if tracked:
+            data._valid_for.add(check_homogenous_list)
+    return check_homogenous_list
+
+
+def _compile_heterogenous_list(form, nested):
+    """Comparison logic for heterogenous list schemas.
     Recurses on dicts and list, otherwise just compares the value via isinstance.
-    Mostly looks exactly like the dict code but uses indexes instead of keys.  May be worth combining them!
 
     Note: this logic is sensitive to ordering!
         If you have implemented an iterable that does not return a consistent iteration order,
@@ -191,53 +441,204 @@ def _check_values_list(form_items, data, assert_raise, key_path):
         is testing against lists of dictionary schemas, checking in an order-agnostic way seems
         expensive and complicated.
 
-    Second Note: this code is never used unless the schema specifies a list of more than one element, i.e.
-        non-homogenous lists. The dict code handles nested lists that are only one element long itself.
-        one-element lists are assumed to match lists of any size,
+    Second Note: this is only used when the schema specifies a list of more than one element, i.e.
+        non-homogenous lists. One-element lists are assumed to match lists of any size,
         as long as their members validate against the schema's only member."""
-    # data having no len() is fine as long as schema has no len()
-    try:
-        form_len = len(form_items)
-    except TypeError:
-        form_len = None
+    checkers = tuple(_compile_schema(value, nested=True) for value in form)
+    form_len = len(form)
+    expected = (list, tuple) if nested else Iterable
+    reported = expected if nested else form
+
+    def check_heterogenous_list(data):
+        if not isinstance(data, expected):
+            raise _SchemaMismatch(data, reported)
+        tracked = type(data) is TrackedList
+        if tracked and check_heterogenous_list in data._valid_for:
+            return
+        # data having no len() is fine as long as schema has no len()
+        try:
+            data_len = len(data)
+        except TypeError:
+            data_len = None
+        if data_len != form_len:
+            raise _SchemaMismatch(data, form, "length", data_len)
+
+        index = 0
+        try:
+            for check in checkers:
+                check(data[index])
+                index += 1
+        except _SchemaMismatch as mismatch:
+            mismatch.path.append(index)
+            raise
+        if tracked:
+            data._valid_for.add(check_heterogenous_list)
+    return check_heterogenous_list
+
+
+def _allows_missing(value):
+    """Whether a dict key with this schema can be left out of the data entirely,
+    i.e. whether the schema accepts None."""
+    if isinstance(value, SchemaOr):
+        return type(None) in value.schemas
     try:
-        data_len = len(data)
+        return isinstance(None, value)
     except TypeError:
-        data_len = None
-
-    assert_raise(form_len == data_len,
-                 key_path,
-                 data,
-                 form_items,
-                 message=("expected a heterogenous list of length {} at ".format(form_len) +
-                          "{name}" + "{},\n\tbut found length {} instead.".format(_render_key_path(key_path), data_len)))
-
-    for index, value in enumerate(form_items):
-
-        if isinstance(value, dict):
-            key_path.append(index)
-            assert_raise(isinstance(data[index], dict), key_path, data[index], dict)
-            _assert_format_matches(value, data[index], assert_raise, key_path)
-
-        elif isinstance(value, SchemaOr):
-            key_path.append(index)
-            _assert_format_matches(value, data[index], assert_raise, key_path)
-
-        elif isinstance(value, list):
-            key_path.append(index)
-            assert_raise(isinstance(data[index], (list, tuple)), key_path, data[index], (list, tuple))
-            if len(data[index]) == 1:
-                key_path.append(index)
-                for i, item in enumerate(data[index]):
-                    ind_key_path = copy(key_path)
-                    ind_key_path.append(i)
-                    _assert_format_matches(value[0], item, assert_raise, ind_key_path)
+        return False
+
+
+#--------------------------
+# Code generation backend
+#--------------------------
+
+# Generated validators, keyed by id() of the schema they were built from.
+# The schema itself is kept alongside so that its id can't be reused.  Entries are published once, as for _compiled_checkers.
+_generated_validators = {}
+
+# Past this many, the generated validators are dropped and generated again as needed.
+MAX_GENERATED_VALIDATORS = 4096
+
+# Past this many levels of indentation, sub-schemas are generated as their own functions
+# so the source stays below python's limit on nested blocks.
+_MAX_GENERATED_INDENT = 12
+
+_LITERAL_KEY_TYPES = (str, int, float, bool, bytes, type(None))
+
+_GENERATED_FILENAME = "<py_types generated schema>"
+
+
+def _generate_validator(form):
+    """Get a validate(data) -> bool function for form, generating and compiling it on first use.
+
+    The generated function only answers whether the data matches. It doesn't build error messages,
+    so it should be paired with the closure checkers from _compile_schema to report failures."""
+    cached = _generated_validators.get(id(form))
+    if cached is not None and cached[0] is form:
+        return cached[1]
+
+    source = _ValidatorSource()
+    name = source.function(form, nested=False)
+    validator = source.build(name)
+    if len(_generated_validators) >= MAX_GENERATED_VALIDATORS:
+        _generated_validators.clear()
+    return _publish(_generated_validators, id(form), form, validator)
+
+
+def _load_validator(code, constants, name, source):
+    """Run the compiled code of a generated validator with its constants, and return the validator called name."""
+    namespace = dict(constants)
+    exec(code, namespace)
+    validator = namespace[name]
+    validator.source = source
+    return validator
+
+
+class _ValidatorSource(object):
+    """Accumulates the python source of a generated validator.
+
+    Every sub-schema is written inline as straight-line ifs and for loops that return False on the first mismatch.
+    Types and other non-literal values are bound as module-level constants of the generated code."""
+    def __init__(self):
+        self.constants = {}
+        self.functions = []
+        self._counter = 0
+
+    def name(self, prefix):
+        self._counter += 1
+        return "{}{}".format(prefix, self._counter)
+
+    def constant(self, value):
+        name = self.name("_c")
+        self.constants[name] = value
+        return name
+
+    def literal(self, key):
+        # inf and nan have no literal; their repr is a bare name.
+        if type(key) in _LITERAL_KEY_TYPES and not (type(key) is float and not math.isfinite(key)):
+            return repr(key)
+        return self.constant(key)
+
+    def function(self, form, nested):
+        """Generate a function that validates data against form, returning its name."""
+        name = self.name("_validate")
+        lines = ["def {}(v0):".format(name)]
+        self.emit(form, "v0", 1, nested, lines)
+        lines.append("    return True")
+        self.functions.append("\n".join(lines))
+        return name
+
+    def text(self):
+        return "\n\n".join(self.functions) + "\n"
+
+    def build(self, name):
+        source = self.text()
+        return _load_validator(compile(source, _GENERATED_FILENAME, "exec"), self.constants, name, source)
+
+    def emit(self, form, var, indent, nested, lines):
+        """Append the checks for var against form to lines."""
+        pad = "    " * indent
+        fail = pad + "    return False"
+
+        if indent > _MAX_GENERATED_INDENT:
+            lines.append(pad + "if not {}({}):".format(self.function(form, nested), var))
+            lines.append(fail)
+
+        elif isinstance(form, SchemaOr):
+            leaves, dicts, lists, others = _group_alternatives(form.schemas)
+            alternatives = []
+            if leaves:
+                leaf_types = tuple(form.schemas[i] for i in leaves)
+                alternatives.append("isinstance({}, {})".format(var, self.constant(leaf_types)))
+            for i in dicts + lists + others:
+                alternatives.append("{}({})".format(self.function(form.schemas[i], False), var))
+            lines.append(pad + "if not ({}):".format(" or ".join(alternatives) or "False"))
+            lines.append(fail)
+
+        elif _is_leaf(form):
+            expected = self.constant(form)
+            if type(form) is type:
+                lines.append(pad + "if type({0}) is not {1} and not isinstance({0}, {1}):".format(var, expected))
             else:
-                _assert_format_matches(value, data[index], assert_raise, key_path)
+                lines.append(pad + "if not isinstance({}, {}):".format(var, expected))
+            lines.append(fail)
+
+        elif isinstance(form, (Mapping, SchemaAllowExtra)):
+            lines.append(pad + "if type({0}) is not dict and not isinstance({0}, dict):".format(var))
+            lines.append(fail)
+            if isinstance(form, SchemaAllowExtra):
+                form = form.schema
+            else:
+                lines.append(pad + "if not {}.issuperset({}):".format(self.constant(frozenset(form.keys())), var))
+                lines.append(fail)
+            for key, value in form.items():
+                key_literal = self.literal(key)
+                item = self.name("v")
+                if _allows_missing(value):
+                    lines.append(pad + "if {} in {}:".format(key_literal, var))
+                    lines.append(pad + "    {} = {}[{}]".format(item, var, key_literal))
+                    self.emit(value, item, indent + 1, True, lines)
+                else:
+                    lines.append(pad + "if {} not in {}:".format(key_literal, var))
+                    lines.append(fail)
+                    lines.append(pad + "{} = {}[{}]".format(item, var, key_literal))
+                    self.emit(value, item, indent, True, lines)
+
         else:
-            item_key_path = copy(key_path)
-            item_key_path.append(index)
-            assert_raise(isinstance(data[index], value), item_key_path, data[index], value)
+            # Only lists and tuples are checked here. Other iterables at the top level return False,
+            # leaving them to the closure checkers.
+            lines.append(pad + "if type({0}) is not list and type({0}) is not tuple and not isinstance({0}, (list, tuple)):".format(var))
+            lines.append(fail)
+            if len(form) == 1:
+                item = self.name("v")
+                lines.append(pad + "for {} in {}:".format(item, var))
+                self.emit(form[0], item, indent + 1, False, lines)
+            else:
+                lines.append(pad + "if len({}) != {}:".format(var, len(form)))
+                lines.append(fail)
+                for index, value in enumerate(form):
+                    item = self.name("v")
+                    lines.append(pad + "{} = {}[{}]".format(item, var, index))
+                    self.emit(value, item, indent, True, lines)
 
 
 #---------------------------
@@ -245,62 +646,118 @@ def _check_values_list(form_items, data, assert_raise, key_path):
 #---------------------------
 
 
-def _call_assert_raise_no_key(assert_raise, cond, key, key_path, value, expected):
-    """Call assert_raise with an approparite message for a missing key."""
-    assert_raise(cond,
-                 key_path,
-                 value,
-                 expected,
-                 message=("expected key '{}' to exist and have value of type {} at ".format(key, expected) +
-                          "{name}" + "{},\n\tbut didn't find it.".format(_render_key_path(key_path))))
-
-
-def _assert_or_raise(function, arg, name, cond, key_path, value, expected, message=None):
-    """The 'I wish I had macros' function.  Just asserts that the conditions are true
-    and raises relevant info if not."""
-    if not cond:
-        if message is None:
-            schema_error = SchemaError(function, arg, name, key_path, value, expected)
-        else:
-            try:
-                message = message.format(function=function, arg=arg, name=name)
-            except KeyError:
-                pass
-            except IndexError:
-                pass
-            complete_message = "\n    In {}, in schema for arg '{}':\n\t".format(function, name) + message
-            schema_error = SchemaError(function, arg, name, key_path, value, expected, message=complete_message)
-        raise schema_error from None
+class _SchemaMismatch(Exception):
+    """Raised inside compiled checkers when data doesn't match its schema.
+
+    Nothing about where the mismatch happened is tracked while checking; instead, each container
+    appends its key or index to path as the exception passes through it, so path is in reverse order.
+    Use schema_error() to turn it into a SchemaError once it reaches the top level.
+
+    kind is one of "type", "missing_key", "extra_key", "length" or "or", and detail holds the
+    missing/extra key, the data's length, or the mismatches for each of a SchemaOr's schemas."""
+    def __init__(self, value, expected, kind="type", detail=None):
+        self.path = []
+        self.value = value
+        self.expected = expected
+        self.kind = kind
+        self.detail = detail
+
+    def key_path(self):
+        return self.path[::-1]
+
+    def message(self, name, key_path):
+        """Describe the mismatch, given the full key path to it."""
+        location = "{}{}".format(name, _render_key_path(key_path))
+        if self.kind == "missing_key":
+            return ("expected key '{}' to exist and have value of type {} at {},\n\tbut didn't find it."
+                    .format(self.detail, self.expected, location))
+        elif self.kind == "extra_key":
+            return ("did not expect key {} in {} with value {}; key was not specified in schema."
+                    .format(self.detail, location, summarize(self.value[self.detail])))
+        elif self.kind == "length":
+            return ("expected a heterogenous list of length {} at {},\n\tbut found length {} instead."
+                    .format(len(self.expected), location, self.detail))
+        elif self.kind == "or":
+            reasons = ["schema {}: {}".format(i, reason.message(name, key_path + reason.key_path()))
+                       for i, reason in enumerate(self.detail)]
+            return ("SchemaOr failed to validate for any schema at {}, with these reasons:\n\t  ".format(location) +
+                    "\n\t  ".join(reasons))
+        return ("at {}, expected value of type {},\n\tbut got value '{}' with type {} instead."
+                .format(location, self.expected, summarize(self.value), type(self.value)))
+
+    def schema_error(self, function, arg, name):
+        """Turn this into a SchemaError.  Its message is only put together if it's asked for."""
+        key_path = self.key_path()
+        if self.kind == "type":
+            return SchemaError(function, arg, name, key_path, self.value, self.expected)
+        return SchemaError(function, arg, name, key_path, self.value, self.expected,
+                           message=functools.partial(self._complete_message, function, name, key_path))
+
+    def _complete_message(self, function, name, key_path):
+        return "\n    In {}, in schema for arg '{}':\n\t".format(function, name) + self.message(name, key_path)
 
 
 class SchemaError(Exception):
-    """Class used for breaking out of schema verification with info on why."""
+    """Class used for breaking out of schema verification with info on why.
+
+    The message isn't formatted until it's asked for (str(), args, or printing the traceback),
+    since failures that are caught and handled, e.g. in batches, never need one.
+    message can be given as a string or as a function returning one; values in the standard
+    message are cut down to a readable size."""
     def __init__(self, function, arg, name, key_path, real, expected, *args, **kwargs):
-        super().__init__(self, *args)
+        super().__init__(*args)
         self.function = function
         self.arg = arg
         self.name = name
         self.key_path = key_path
         self.real_value = real
         self.expected_value = expected
-        if "message" in kwargs:
-            self.args = (kwargs["message"],)
-        else:
-            self.set_expected_type_message()
+        self._message = kwargs.get("message")
+
+    def __reduce__(self):
+        # The message is sent as a string, since a function building it may not pickle.
+        return (SchemaError,
+                (self.function, self.arg, self.name, self.key_path, self.real_value, self.expected_value),
+                {"_message": self.message})
+
+    @property
+    def message(self):
+        message = self._message
+        if message is None:
+            message = self._message = self._expected_type_message()
+        elif not isinstance(message, str):
+            message = self._message = message()
+        return message
+
+    @property
+    def args(self):
+        return (self.message,)
+
+    @args.setter
+    def args(self, args):
+        self._message = args[0] if args else ""
+
+    def __str__(self):
+        return self.message
+
+    def __repr__(self):
+        return "SchemaError({!r})".format(self.message)
 
     def set_expected_type_message(self):
-        """Set the standard message for type mismatch."""
+        """Use the standard message for type mismatch."""
+        self._message = None
+
+    def _expected_type_message(self):
         key_path_trace = _render_key_path(self.key_path)
         message_base = ("\n    In {function}, in schema for arg '{name}':\n\t" +
                         "at {name}{key_path_trace}, expected value of type {expected},\n\t" +
                         "but got value '{real}' with type {real_type} instead.")
-        message = message_base.format(function=self.function,
-                                      name=self.name,
-                                      key_path_trace=key_path_trace,
-                                      expected=self.expected_value,
-                                      real=self.real_value,
-                                      real_type=type(self.real_value))
-        self.args = (message,)
+        return message_base.format(function=self.function,
+                                   name=self.name,
+                                   key_path_trace=key_path_trace,
+                                   expected=self.expected_value,
+                                   real=summarize(self.real_value),
+                                   real_type=type(self.real_value))
 
 
 def _render_key_path(key_path):
@@ -0,0 +1,53 @@
+"""Validating streams of records without holding them in memory.
+
+Both helpers here return generators which check each record as it is taken, so only the current record
+is ever held.  They raise a SchemaError at the first record that doesn't match its schema."""
+
+import json
+import os
+
+from .schema import (
+    _record_checker,
+    _SchemaMismatch,
+    _validate_stream,
+)
+
+
+def validate_stream(form, items, backend="closures", name="items"):
+    """Yield each of items, checking it against form first.
+    In errors, the item at index i is reported as name[i]."""
+    return _validate_stream(_record_checker(form, backend), items, None, name)
+
+
+def validate_json_lines(form, source, backend="closures", name=None, encoding="utf-8"):
+    """Yield each record of a JSON lines file, decoded and checked against form.
+
+    source can be a path or an open file (or any iterable of lines).  A path is opened when iteration starts
+    and closed when it ends.  Blank lines are skipped.
+    In errors, the record on line n is reported as name[n]; name defaults to the file's name.
+    Lines that aren't valid JSON raise a ValueError giving the line number."""
+    check = _record_checker(form, backend)
+    if isinstance(source, (str, bytes, os.PathLike)):
+        return _validate_json_lines_file(check, source, name or os.fsdecode(source), encoding)
+    return _validate_json_lines(check, source, name or getattr(source, "name", "lines"))
+
+
+def _validate_json_lines_file(check, path, name, encoding):
+    with open(path, encoding=encoding) as lines:
+        yield from _validate_json_lines(check, lines, name)
+
+
+def _validate_json_lines(check, lines, name):
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as error:
+            raise ValueError("Invalid JSON on line {} of {}: {}".format(line_number, name, error)) from error
+        try:
+            check(record)
+        except _SchemaMismatch as mismatch:
+            mismatch.path.append(line_number)
+            raise mismatch.schema_error(None, record, name) from None
+        yield record
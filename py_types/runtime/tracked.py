@@ -0,0 +1,247 @@
+"""Tracked payloads, which let schema checks skip parts of the data that haven't changed.
+
+track(data) copies the dicts and lists in data into TrackedDicts and TrackedLists.  When a schema check passes
+for a tracked dict or list, it's remembered on that dict or list, and the next check against the same
+compiled schema skips it.  Writing to a tracked dict or list forgets this for it and every dict or list
+containing it, so the next check only goes down the paths that were written to.
+
+Copies (copy.copy, copy.deepcopy) are tracked as well, and keep the checks the original had passed.
+Only writes through the tracked dicts and lists themselves are seen.  Other mutable values in the data
+(sets, custom objects, ...) shouldn't be changed in place once it's tracked."""
+
+from copy import deepcopy
+
+
+# Stands in for a key that wasn't in a dict.
+_MISSING = object()
+
+
+def track(data):
+    """Copy data, turning the dicts and lists in it (including ones inside tuples) into TrackedDicts and TrackedLists."""
+    return _tracked(data, None)
+
+
+def _tracked(value, parent):
+    """Convert value to a tracked container if it's a dict or list, recording parent as containing it."""
+    value_type = type(value)
+    if value_type is TrackedDict or value_type is TrackedList:
+        if parent is not None:
+            entry = value._parents.get(id(parent))
+            if entry is None:
+                value._parents[id(parent)] = [parent, 1]
+            else:
+                entry[1] += 1
+        return value
+    if isinstance(value, dict):
+        return TrackedDict(value, _parent=parent)
+    if isinstance(value, list):
+        return TrackedList(value, _parent=parent)
+    if value_type is tuple:
+        return tuple(_tracked(item, parent) for item in value)
+    return value
+
+
+def _release(value, parent):
+    """Record that parent holds value in one place fewer, forgetting parent once it no longer holds it anywhere."""
+    value_type = type(value)
+    if value_type is TrackedDict or value_type is TrackedList:
+        entry = value._parents.get(id(parent))
+        if entry is not None:
+            entry[1] -= 1
+            if entry[1] <= 0:
+                del value._parents[id(parent)]
+    elif value_type is tuple:
+        for item in value:
+            _release(item, parent)
+
+
+def _invalidate(container):
+    """Forget the passed checks of container and everything containing it."""
+    stack = [container]
+    seen = set()
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        current._valid_for.clear()
+        stack.extend(parent for parent, _ in current._parents.values())
+
+
+class TrackedDict(dict):
+    """A dict that remembers which compiled schemas it has passed, until it's written to.
+    Dict and list values are tracked too.  See track()."""
+    def __init__(self, *args, _parent=None, **kwargs):
+        super().__init__()
+        self._valid_for = set()
+        self._parents = {} if _parent is None else {id(_parent): [_parent, 1]}
+        for key, value in dict(*args, **kwargs).items():
+            super().__setitem__(key, _tracked(value, self))
+
+    def __setitem__(self, key, value):
+        _invalidate(self)
+        replaced = super().get(key, _MISSING)
+        super().__setitem__(key, _tracked(value, self))
+        _release(replaced, self)
+
+    def __delitem__(self, key):
+        _invalidate(self)
+        removed = super().__getitem__(key)
+        super().__delitem__(key)
+        _release(removed, self)
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def __copy__(self):
+        copied = TrackedDict(self)
+        copied._valid_for.update(self._valid_for)
+        return copied
+
+    def __deepcopy__(self, memo):
+        copied = TrackedDict()
+        memo[id(self)] = copied
+        for key, value in self.items():
+            dict.__setitem__(copied, deepcopy(key, memo), _tracked(deepcopy(value, memo), copied))
+        copied._valid_for.update(self._valid_for)
+        return copied
+
+    def __reduce__(self):
+        return (TrackedDict, (dict(self),))
+
+    def clear(self):
+        _invalidate(self)
+        removed = list(self.values())
+        super().clear()
+        for value in removed:
+            _release(value, self)
+
+    def pop(self, key, *default):
+        _invalidate(self)
+        if key not in self:
+            return super().pop(key, *default)
+        value = super().pop(key)
+        _release(value, self)
+        return value
+
+    def popitem(self):
+        _invalidate(self)
+        item = super().popitem()
+        _release(item[1], self)
+        return item
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+
+class TrackedList(list):
+    """A list that remembers which compiled schemas it has passed, until it's written to.
+    Dict and list items are tracked too.  See track()."""
+    def __init__(self, iterable=(), _parent=None):
+        super().__init__()
+        self._valid_for = set()
+        self._parents = {} if _parent is None else {id(_parent): [_parent, 1]}
+        super().extend(_tracked(item, self) for item in iterable)
+
+    def __setitem__(self, index, value):
+        _invalidate(self)
+        replaced = super().__getitem__(index)
+        if isinstance(index, slice):
+            value = [_tracked(item, self) for item in value]
+            try:
+                super().__setitem__(index, value)
+            except Exception:
+                # e.g. an extended slice given the wrong number of items.
+                for item in value:
+                    _release(item, self)
+                raise
+            for item in replaced:
+                _release(item, self)
+        else:
+            super().__setitem__(index, _tracked(value, self))
+            _release(replaced, self)
+
+    def __delitem__(self, index):
+        _invalidate(self)
+        removed = super().__getitem__(index)
+        super().__delitem__(index)
+        for item in (removed if isinstance(index, slice) else [removed]):
+            _release(item, self)
+
+    def __iadd__(self, other):
+        self.extend(other)
+        return self
+
+    def __copy__(self):
+        copied = TrackedList(self)
+        copied._valid_for.update(self._valid_for)
+        return copied
+
+    def __deepcopy__(self, memo):
+        copied = TrackedList()
+        memo[id(self)] = copied
+        list.extend(copied, [_tracked(deepcopy(item, memo), copied) for item in self])
+        copied._valid_for.update(self._valid_for)
+        return copied
+
+    def __reduce__(self):
+        return (TrackedList, (list(self),))
+
+    def __imul__(self, count):
+        _invalidate(self)
+        items = list(self)
+        super().__imul__(count)
+        if count < 1:
+            for item in items:
+                _release(item, self)
+        for _ in range(count - 1):
+            for item in items:
+                _tracked(item, self)
+        return self
+
+    def append(self, item):
+        _invalidate(self)
+        super().append(_tracked(item, self))
+
+    def extend(self, iterable):
+        _invalidate(self)
+        super().extend(_tracked(item, self) for item in iterable)
+
+    def insert(self, index, item):
+        _invalidate(self)
+        super().insert(index, _tracked(item, self))
+
+    def pop(self, *args):
+        _invalidate(self)
+        item = super().pop(*args)
+        _release(item, self)
+        return item
+
+    def remove(self, item):
+        _invalidate(self)
+        index = super().index(item)
+        removed = super().__getitem__(index)
+        super().__delitem__(index)
+        _release(removed, self)
+
+    def clear(self):
+        _invalidate(self)
+        removed = list(self)
+        super().clear()
+        for item in removed:
+            _release(item, self)
+
+    def sort(self, *args, **kwargs):
+        _invalidate(self)
+        super().sort(*args, **kwargs)
+
+    def reverse(self):
+        _invalidate(self)
+        super().reverse()
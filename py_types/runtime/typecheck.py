@@ -1,39 +1,71 @@
 import functools
-from collections import namedtuple
+
+from .binding import (
+    bind_checks,
+    build_binding_plan,
+)
+from .config import (
+    current_mode,
+    sampling_for,
+)
+from .formatting import summarize
 
 # ------------------
 # type check
 # ------------------
 
 
-def typecheck(f):
+def typecheck(f=None, *, mode=None, sample=None, adaptive=None):
+    """Check that a function's arguments and return value are instances of their annotated types.
 
-    @functools.wraps(f)
-    def wrapper(*args, **kwargs):
-        for i, arg in enumerate(args[:f.__code__.co_nlocals]):
-            _compare_types(f, f.__code__.co_varnames[i], arg)
-        for name, arg in kwargs.items():
-            _compare_types(f, name, arg)
+    Which arguments are checked against which types is worked out once, when the function is decorated.
 
-        result = f(*args, **kwargs)
+    Can be used bare (@typecheck) or with options (@typecheck(mode="on")).
+    mode overrides the mode from runtime.config for this function; with "off", f is returned unchanged.
+    sample checks only 1 in every `sample` calls (or a fraction of calls, if it's a float),
+    and adaptive checks functions whose checks keep passing less often.  See runtime.config."""
+    if f is None:
+        return functools.partial(typecheck, mode=mode, sample=sample, adaptive=adaptive)
+    mode = current_mode(f, mode)
+    if mode == "off":
+        return f
 
-        _compare_types(f, 'return', result)
-        return result
-    return wrapper
+    plan = build_binding_plan(f, functools.partial(_type_checker, f))
+    return bind_checks(f, plan, sampling_for(mode, sample, adaptive))
 
 
-def _compare_types(f, name, arg):
-    expected = f.__annotations__.get(name, None)
+def _type_checker(f, name, expected):
+    """Build the check(arg) callable for one annotation, or None if the annotation isn't checked."""
     # If the annotation isn't a type (a class), just don't check it.
     # Done to allow inter-op with other decorators using annotations.
     if type(expected) not in [type, type(None)]:
-        return
-
-    if name == "return" and (expected is type(None) or expected is None) and arg:
-        raise TypeError("\n    In {}:\n\texpected no return value \n\tbut got return value {} of type {}".format(f, arg, type(arg)))
-    if expected and not isinstance(arg, expected):
-        if name == "return":
-            desc = "expected a return type of {},".format(expected)
-        else:
-            desc = "expected argument '{}' to have type {},".format(name, expected)
-        raise TypeError("\n    In {}:\n\t{}\n\tbut instead got value '{}' with type {}.".format(f, desc, arg, type(arg)))
+        return None
+
+    if name == "return" and (expected is type(None) or expected is None):
+        def check_no_return(arg):
+            if arg:
+                raise TypeError("\n    In {}:\n\texpected no return value \n\tbut got return value {} of type {}".format(f, summarize(arg), type(arg)))
+            if expected is not None and arg is not None:
+                _raise_type_error(f, "expected a return type of {},".format(expected), arg)
+        return check_no_return
+
+    if expected is None:
+        return None
+    return _isinstance_checker(f, name, expected)
+
+
+def _isinstance_checker(f, name, expected):
+    """Build a check(arg) callable that raises a TypeError unless isinstance(arg, expected)."""
+    if name == "return":
+        desc = "expected a return type of {},".format(expected)
+    else:
+        desc = "expected argument '{}' to have type {},".format(name, expected)
+
+    def check_type(arg):
+        if not isinstance(arg, expected):
+            _raise_type_error(f, desc, arg)
+    return check_type
+
+
+def _raise_type_error(f, desc, arg):
+    raise TypeError("\n    In {}:\n\t{}\n\tbut instead got value '{}' with type {}.".format(f, desc, summarize(arg), type(arg)))
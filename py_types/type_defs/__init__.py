@@ -6,6 +6,7 @@ as well as commonly used and convenient types."""
 from .base import (
     TypeFamily,
     ValidatedType,
+    validator_cost,
 )
 
 from .functions import Function
@@ -3,10 +3,31 @@ Types built with these will return True for calls to isinstance()
 whenever called with an argument that corresponds to their specified types.
 Classes that inherit from others will automatically have their types extended."""
 
+from abc import (
+    ABCMeta,
+    get_cache_token,
+)
 from collections.abc import (
     Callable
 )
+import copyreg
 from copy import deepcopy
+from functools import lru_cache
+import sys
+
+
+# TypeFamily caches at most this many verdicts per class before starting over.
+MAX_CACHED_VERDICTS = 256
+
+# Key under which each verdict cache stores the abc cache token it was built with.
+_ABC_TOKEN = object()
+
+# Validators without a cost hint are treated as having this cost.
+DEFAULT_VALIDATOR_COST = 1
+
+# Instances of exactly these types can have ValidatedType results memoized.
+# Containers are left out even when hashable, since e.g. (1,) == (True,) would share a result.
+MEMOIZABLE_TYPES = (int, float, complex, str, bytes, bool, type(None))
 
 
 def can_check_isinstance(specified_type):
@@ -18,6 +39,26 @@ def can_check_isinstance(specified_type):
     return True
 
 
+def validator_cost(cost):
+    """Decorator giving a validator a cost hint.  ValidatedType runs cheaper validators first."""
+    def set_cost(validator):
+        validator.cost = cost
+        return validator
+    return set_cost
+
+
+def is_type_only(specified_type):
+    """Checks whether isinstance(instance, specified_type) depends only on type(instance).
+    This holds for plain classes, abstract base classes and TypeFamily classes made of them,
+    but not for ValidatedTypes or other types with a custom __instancecheck__."""
+    if isinstance(specified_type, tuple):
+        return all(is_type_only(ty) for ty in specified_type)
+    metaclass = type(specified_type)
+    if metaclass is type or metaclass is ABCMeta:
+        return True
+    return metaclass is TypeFamily and specified_type._type_only
+
+
 class TypeFamily(type):
     """
     Abstract base class for types/type families.
@@ -25,6 +66,12 @@ class TypeFamily(type):
     which will have the parents' _registered_types be extended with those in "type_members".
     This in turn gets set to the current class' _registered_types, which is used by the
     isinstance override.
+
+    When every member only looks at an instance's type (see is_type_only), the verdict for each
+    type is cached per class, so repeated checks on the same types are a dict lookup.
+    The cache is dropped whenever an abstract base class gets a new register() call.
+    It's safe to share between threads without a lock: a dropped cache is replaced with a new dict
+    rather than cleared, so a verdict worked out against the old abc registrations can only land in the old one.
     """
 
     def __new__(cls, name, bases, attrs):
@@ -40,11 +87,48 @@ class TypeFamily(type):
                 raise TypeError("Expected a type <class 'type'> for all validated_types but got value {} of type {}.".format(ty, type(ty)))
         new_attrs = deepcopy(attrs)
         new_attrs["_registered_types"] = types
+        new_attrs["_members"] = tuple(types)
+        new_attrs["_type_only"] = all(is_type_only(ty) for ty in types)
+        new_attrs["_verdicts"] = {}
         return super().__new__(cls, name, bases, new_attrs)
 
     def __instancecheck__(cls, instance):
-        acceptable_types = tuple(cls._registered_types)
-        return isinstance(instance, acceptable_types)
+        if not cls._type_only:
+            return isinstance(instance, cls._members)
+
+        verdicts = cls._verdicts
+        token = get_cache_token()
+        if verdicts.get(_ABC_TOKEN) != token:
+            verdicts = cls._verdicts = {_ABC_TOKEN: token}
+
+        instance_type = type(instance)
+        verdict = verdicts.get(instance_type)
+        if verdict is None:
+            verdict = isinstance(instance, cls._members)
+            # Objects that fake their __class__ (proxies, mocks) could disagree with others of the same type.
+            if instance.__class__ is instance_type:
+                if len(verdicts) > MAX_CACHED_VERDICTS:
+                    verdicts = cls._verdicts = {_ABC_TOKEN: token}
+                verdicts[instance_type] = verdict
+        return verdict
+
+
+def _reduce_type_family(cls):
+    """Pickle TypeFamily classes by reference when they can be imported, like any other class.
+    Ones that can't (defined inside a function, say) are pickled by their members instead,
+    so schemas using them can still be sent to other processes.  Only the members survive this;
+    methods and other attributes are left behind."""
+    module = sys.modules.get(cls.__module__)
+    found = module
+    for part in cls.__qualname__.split("."):
+        found = getattr(found, part, None)
+    if found is cls:
+        return cls.__qualname__
+    attrs = {"type_members": list(cls._members), "__module__": cls.__module__, "__qualname__": cls.__qualname__}
+    return (TypeFamily, (cls.__name__, (), attrs))
+
+
+copyreg.pickle(TypeFamily, _reduce_type_family)
 
 
 class ValidatedType(type):
@@ -53,6 +137,11 @@ class ValidatedType(type):
     inheritance through "type_members" is preserved, and inheritance of validators
     through "validators" is also in place.
     Validators are considered to be callables that return a bool.
+
+    Validators run in order of their cost hint (see validator_cost), cheapest first,
+    and checking stops at the first one that fails.
+    Setting the class attribute "memoize" to a number memoizes results for up to that many
+    instances of simple immutable types (see MEMOIZABLE_TYPES), dropping the least recently used.
     """
 
     def __new__(cls, name, bases, attrs):
@@ -78,14 +167,34 @@ class ValidatedType(type):
         new_attrs = deepcopy(attrs)
         new_attrs["_registered_types"] = types
         new_attrs["_registered_validators"] = validators
-        return super().__new__(cls, name, bases, new_attrs)
+        new_attrs["_members"] = tuple(types)
+        new_attrs["_validators"] = tuple(sorted(validators, key=lambda va: getattr(va, "cost", DEFAULT_VALIDATOR_COST)))
+        new_attrs["_memoized"] = None
+        new_class = super().__new__(cls, name, bases, new_attrs)
+
+        memoize = getattr(new_class, "memoize", None)
+        if memoize:
+            new_class._memoized = lru_cache(maxsize=memoize)(_validator_runner(new_class._validators))
+        return new_class
 
     def __instancecheck__(cls, instance):
-        acceptable_types = tuple(cls._registered_types)
-        if not isinstance(instance, acceptable_types):
+        if not isinstance(instance, cls._members):
             return False
 
-        all_valid_validators = [validator for validator in cls._registered_validators if isinstance(validator, Callable)]
-        all_pass = all([validator(instance) for validator in all_valid_validators])
-
-        return all_pass
+        if cls._memoized is not None and type(instance) in MEMOIZABLE_TYPES:
+            return cls._memoized(type(instance), instance)
+        for validator in cls._validators:
+            if not validator(instance):
+                return False
+        return True
+
+
+def _validator_runner(validators):
+    """Build the function ValidatedType memoizes.  It takes the instance's type
+    as well, so that e.g. 1 and True aren't treated as the same instance."""
+    def run_validators(instance_type, instance):
+        for validator in validators:
+            if not validator(instance):
+                return False
+        return True
+    return run_validators
@@ -2,9 +2,15 @@
 
 Instead of checking against collections.Callable, you can use these
 for functions with arity/return type checks."""
-from collections import (
+from collections.abc import (
     Callable,
 )
+import inspect
+from types import (
+    FunctionType,
+    MethodType,
+)
+from weakref import WeakKeyDictionary
 
 from .base import (
     TypeFamily,
@@ -29,7 +35,13 @@ class Function(metaclass=TypeFamily):
         if your function takes only *args, **kwargs, and extracts 4 values from them,
         you should consider it to have an arity of 2.
     return_type is compared directly with the return annotation. If there is no annotation,
-        it skips the check (since gradual typing is a goal)."""
+        it skips the check (since gradual typing is a goal).
+
+    Verdicts are remembered per function object for plain functions, per underlying function for bound methods,
+    and per object for other callables (partials, builtins, callable instances), all weakly referenced.
+    Not per code object: closures made by one factory share their code, but each has its own return annotation.
+    Callables other than plain functions are inspected with inspect.signature, so a bound method's arity
+    doesn't include self and a partial's doesn't include the arguments it already has."""
     type_members = [Callable]
 
     def __init__(self, *args, **kwargs):
@@ -51,21 +63,58 @@ class Function(metaclass=TypeFamily):
 
         self.arity = arity
         self.return_type = return_type
+        self._verdicts = WeakKeyDictionary()
+        self._method_verdicts = WeakKeyDictionary()
+
+    def __getstate__(self):
+        # The verdict caches hold weak references, which can't be pickled.
+        return {"arity": self.arity, "return_type": self.return_type}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._verdicts = WeakKeyDictionary()
+        self._method_verdicts = WeakKeyDictionary()
 
     def __instancecheck__(self, instance):
+        instance_type = type(instance)
+        if instance_type is MethodType:
+            key, verdicts = instance.__func__, self._method_verdicts
+        else:
+            key, verdicts = instance, self._verdicts
+
+        try:
+            return verdicts[key]
+        except KeyError:
+            pass
+        except TypeError:
+            # Not hashable or can't be weakly referenced, so it can't be remembered.
+            return self._check(instance)
+
+        verdict = self._check(instance)
+        verdicts[key] = verdict
+        return verdict
+
+    def _check(self, instance):
         if not isinstance(instance, Callable):
             return False
 
-        if "return" in instance.__annotations__:
-            if not issubclass(instance.__annotations__["return"], self.return_type):
-                return False
-
-        if not hasattr(instance, "__code__"):
-            instance = instance.__call__
-        f_code = instance.__code__
+        if type(instance) is FunctionType:
+            if "return" in instance.__annotations__:
+                if not issubclass(instance.__annotations__["return"], self.return_type):
+                    return False
+            return instance.__code__.co_argcount == self.arity
 
-        if f_code.co_argcount != self.arity:
+        try:
+            signature = inspect.signature(instance)
+        except (TypeError, ValueError):
             return False
 
-        return True
+        return_annotation = signature.return_annotation
+        if return_annotation is not signature.empty:
+            if not issubclass(return_annotation, self.return_type):
+                return False
+
+        positional = [parameter for parameter in signature.parameters.values()
+                      if parameter.kind in (parameter.POSITIONAL_ONLY, parameter.POSITIONAL_OR_KEYWORD)]
+        return len(positional) == self.arity
 
@@ -1,15 +1,45 @@
 """Module for structured data types -- lists and dicts.
 Defines type families that type check each of their members."""
+from array import array
 from collections.abc import (
     Sequence,
 )
+import sys
 
 from .base import (
     TypeFamily,
+    is_type_only,
 )
 from .common import (
     Any,
 )
+from ..validation_cache import resolve_cache
+
+
+# memoryview formats whose elements all come out as the same type.
+_HOMOGENOUS_FORMATS = frozenset("bBhHiIlLqQnNPfde?c")
+
+# NumPy dtype kinds whose elements all come out as the same type: bool, numbers, and fixed width strings.
+_HOMOGENOUS_DTYPE_KINDS = frozenset("biufcSU")
+
+
+def _is_homogenous(instance):
+    """Whether the type of instance guarantees that all of its elements have the same type,
+    like array.array's typecode."""
+    instance_type = type(instance)
+    if instance_type is bytes or instance_type is bytearray or instance_type is array:
+        return True
+    if instance_type is memoryview:
+        return instance.ndim == 1 and instance.format.lstrip("@=<>!") in _HOMOGENOUS_FORMATS
+    return False
+
+
+def _is_homogenous_ndarray(instance):
+    """Whether instance is a 1-dimensional NumPy array whose dtype gives all elements the same type."""
+    # NumPy is never imported here; if it hasn't been imported, instance can't be an array.
+    numpy = sys.modules.get("numpy")
+    return (numpy is not None and isinstance(instance, numpy.ndarray) and
+            instance.ndim == 1 and instance.dtype.kind in _HOMOGENOUS_DTYPE_KINDS)
 
 
 class TypedSequence(metaclass=TypeFamily):
@@ -19,9 +49,18 @@ class TypedSequence(metaclass=TypeFamily):
 
     This class' compare_to always compares to Sequence, so you could probably leave type_members empty.
     __init__ expects only a type value that it will restrict its members to.  The default is Any.
+
+    When the restriction only depends on each element's type (see base.is_type_only), containers that
+    hold a single type of element (bytes, array.array, 1-dimensional memoryviews and NumPy arrays) are
+    checked by their first element alone.  array.array and 1-dimensional NumPy arrays are accepted as sequences.
+    Other sequences are scanned until the first element that doesn't match.
+
+    The cache keyword takes a py_types.validation_cache.ValidationCache (or True for the default one),
+    which remembers tuples (of tuples, strings, ...) that have already matched, so checking them again is a lookup.
     """
     type_members = [Sequence]
     _restricted_to = None
+    _cache = None
 
     def __init__(self, *args, **kwargs):
         if "restricted_to" in kwargs:
@@ -30,20 +69,52 @@ class TypedSequence(metaclass=TypeFamily):
             self._restricted_to = args[0]
         else:
             self._restricted_to = Any
+        self._type_only = is_type_only(self._restricted_to)
+        self._cache = resolve_cache(kwargs.get("cache"))
 
     def __instancecheck__(self, instance):
         """Ensure that instance is a sequence, instance is one of self.type_members,
         and that each member is one of self._restricted_to."""
+        cache = self._cache
+        if cache is None:
+            return self._matches(instance)
+        if cache.passed(self, instance):
+            return True
+        if self._matches(instance):
+            cache.add(self, instance)
+            return True
+        return False
+
+    def _matches(self, instance):
+        restricted_to = self._restricted_to
         if not isinstance(instance, Sequence):
+            # array.array is only registered as a Sequence from python 3.10.
+            if self._type_only and (type(instance) is array or _is_homogenous_ndarray(instance)):
+                return len(instance) == 0 or isinstance(instance[0], restricted_to)
             return False
-
-        acceptable_types = tuple(self._registered_types)
-        if not isinstance(instance, acceptable_types):
+        if not isinstance(instance, self._members):
             return False
 
-        are_values_valid = all([isinstance(value, self._restricted_to) for value in instance])
-
-        return are_values_valid
+        if self._type_only and _is_homogenous(instance):
+            return len(instance) == 0 or isinstance(instance[0], restricted_to)
+        elif not self._type_only:
+            for value in instance:
+                if not isinstance(value, restricted_to):
+                    return False
+        elif type(restricted_to) is type:
+            for value in instance:
+                if type(value) is not restricted_to and not isinstance(value, restricted_to):
+                    return False
+        else:
+            # Runs of elements of the same type only need checking once.
+            last_valid_type = None
+            for value in instance:
+                value_type = type(value)
+                if value_type is not last_valid_type:
+                    if not isinstance(value, restricted_to):
+                        return False
+                    last_valid_type = value_type
+        return True
 
 
 class TypedDict(metaclass=TypeFamily):
@@ -53,10 +124,16 @@ class TypedDict(metaclass=TypeFamily):
     and __vals_restricted_To__ is enforced on the values.
 
     Note that all values are allowed to be a dictionary themselves, as long as their children
-    also are instances of __keys_restricted_to__ and __vals_restricted_to__."""
+    also are instances of __keys_restricted_to__ and __vals_restricted_to__.
+
+    Nested dicts are walked with an explicit stack, so deep dicts can't hit the recursion limit.
+    For untrusted data, max_depth (levels of nesting, the top-level dict being 1) and max_nodes
+    (keys visited in total) can be passed as keyword arguments; dicts going past either are not instances."""
     type_members = [dict]
     _keys_restricted_to = None
     _vals_restricted_to = None
+    _max_depth = None
+    _max_nodes = None
 
     def __init__(self, *args, **kwargs):
         if "keys_restricted_to" in kwargs:
@@ -74,19 +151,41 @@ class TypedDict(metaclass=TypeFamily):
         else:
             self._vals_restricted_to = Any
 
+        self._max_depth = kwargs.get("max_depth", None)
+        self._max_nodes = kwargs.get("max_nodes", None)
+
     def __instancecheck__(self, instance):
-        def walk_and_compare(current_key, current_val):
-            """recursively walk the dict, checking that each key is one of _keys_restricted_to
-            and that each value is either a dict or one of _vals_restricted_to"""
-            if current_key and not isinstance(current_key, self._keys_restricted_to):
+        """Walk the dict, checking that each key is one of _keys_restricted_to
+        and that each value is either a dict or one of _vals_restricted_to.
+        Stops at the first key or value that doesn't match."""
+        keys_restricted_to = self._keys_restricted_to
+        vals_restricted_to = self._vals_restricted_to
+        max_depth = self._max_depth
+        max_nodes = self._max_nodes
+
+        if not isinstance(instance, dict):
+            return isinstance(instance, vals_restricted_to)
+
+        nodes = 0
+        # Dicts seen before (shared or cyclic references) don't need walking again.
+        seen = {id(instance)}
+        stack = [(instance, 1)]
+        while stack:
+            current, depth = stack.pop()
+            if max_depth is not None and depth > max_depth:
                 return False
-
-            if not isinstance(current_val, dict):
-                if not isinstance(current_val, self._vals_restricted_to):
+            if max_nodes is not None:
+                nodes += len(current)
+                if nodes > max_nodes:
                     return False
-                return True
-
-            remaining = [walk_and_compare(key, value) for key, value in current_val.items()]
-            return all(remaining)
 
-        return walk_and_compare(None, instance)
+            for key, value in current.items():
+                if not isinstance(key, keys_restricted_to):
+                    return False
+                if isinstance(value, dict):
+                    if id(value) not in seen:
+                        seen.add(id(value))
+                        stack.append((value, depth + 1))
+                elif not isinstance(value, vals_restricted_to):
+                    return False
+        return True
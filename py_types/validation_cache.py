@@ -0,0 +1,150 @@
+"""A cache of data already proven to pass a check, for immutable data passed in again and again.
+
+Entries are keyed by the identity of the check and of the data, so the same config tuple passed to a checked
+function on every request is only walked the first time.  Only data that can't change is cached: tuples,
+frozensets, strings, bytes, numbers, None and booleans, nested in any way.
+Tuples can't be weakly referenced, so each entry holds on to its data, and the cache is a bounded LRU.
+
+Entries aren't keyed by value, even for hashable data, since equal values can still check differently:
+(1,) == (True,), but only one of them is a tuple of bools."""
+
+import threading
+from collections import namedtuple
+
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+_IMMUTABLE_CONTAINERS = (tuple, frozenset)
+_IMMUTABLE_SCALARS = frozenset([str, bytes, int, float, complex, bool, type(None)])
+
+
+def is_immutable(data):
+    """Whether data, and everything in it, can't be changed."""
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        value_type = type(value)
+        if value_type in _IMMUTABLE_SCALARS:
+            continue
+        if value_type is tuple or value_type is frozenset:
+            stack.extend(value)
+            continue
+        return False
+    return True
+
+
+class _Counts(object):
+    """One thread's hits and misses."""
+    __slots__ = ("hits", "misses")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+
+class ValidationCache(object):
+    """A bounded LRU cache of (check, data) pairs where data passed check.
+
+    check is anything identifying a compiled check (a schema checker, a TypedSequence, ...), and must stay
+    the same object between calls for the cache to hit.  Hits and misses only count data that could be cached.
+
+    Lookups don't take a lock, and hits and misses are counted per thread and added up by info(),
+    so threads checking at the same time don't wait on each other.  Adding entries takes the lock.
+    A hit only moves its entry to the back of the LRU when the lock is free, so under contention
+    the least recently used entry is approximate."""
+    def __init__(self, maxsize=1024):
+        if maxsize < 1:
+            raise ValueError("Expected a maxsize of at least 1, but got {}.".format(maxsize))
+        self.maxsize = maxsize
+        # Plain dicts keep insertion order; the oldest entry is first.
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._all_counts = []
+
+    def _counts(self):
+        """Get the calling thread's counts."""
+        try:
+            return self._local.counts
+        except AttributeError:
+            counts = self._local.counts = _Counts()
+            with self._lock:
+                self._all_counts.append(counts)
+            return counts
+
+    def passed(self, check, data):
+        """Whether data is known to have passed check."""
+        if type(data) not in _IMMUTABLE_CONTAINERS:
+            return False
+        key = (id(check), id(data))
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] is check and entry[1] is data:
+            self._counts().hits += 1
+            if self._lock.acquire(blocking=False):
+                try:
+                    # Moving the entry to the back: a lookup in another thread in between just misses.
+                    if self._entries.pop(key, None) is not None:
+                        self._entries[key] = entry
+                finally:
+                    self._lock.release()
+            return True
+        self._counts().misses += 1
+        return False
+
+    def add(self, check, data):
+        """Remember that data passed check, if data is immutable.  Returns whether it was remembered."""
+        if type(data) not in _IMMUTABLE_CONTAINERS or not is_immutable(data):
+            return False
+        key = (id(check), id(data))
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (check, data)
+            if len(self._entries) > self.maxsize:
+                del self._entries[next(iter(self._entries))]
+        return True
+
+    def clear(self):
+        """Forget every entry, and reset the counters."""
+        with self._lock:
+            self._entries = {}
+            self._local = threading.local()
+            self._all_counts = []
+
+    @property
+    def hits(self):
+        return sum(counts.hits for counts in list(self._all_counts))
+
+    @property
+    def misses(self):
+        return sum(counts.misses for counts in list(self._all_counts))
+
+    def info(self):
+        """The counts so far, added up over every thread."""
+        all_counts = list(self._all_counts)
+        return CacheInfo(sum(counts.hits for counts in all_counts), sum(counts.misses for counts in all_counts),
+                         self.maxsize, len(self._entries))
+
+    def __reduce__(self):
+        # Entries only mean something in this process, so copies start out empty.
+        if self is default_cache:
+            return (_get_default_cache, ())
+        return (ValidationCache, (self.maxsize,))
+
+
+# The cache used when cache=True is given instead of a ValidationCache.
+default_cache = ValidationCache()
+
+
+def _get_default_cache():
+    return default_cache
+
+
+def resolve_cache(cache):
+    """Turn a cache= argument (None, False, True or a ValidationCache) into a ValidationCache or None."""
+    if cache is None or cache is False:
+        return None
+    if cache is True:
+        return default_cache
+    if isinstance(cache, ValidationCache):
+        return cache
+    raise TypeError("Expected a ValidationCache or True for cache, but got value {} of type {}.".format(cache, type(cache)))
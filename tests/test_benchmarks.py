@@ -0,0 +1,20 @@
+from benchmarks.cases import CASES
+from benchmarks.threads import run_threads
+
+import unittest
+
+
+class BenchmarkCasesTestCase(unittest.TestCase):
+    """Makes sure every benchmark case still sets up and runs, so the suite doesn't rot between runs."""
+    def test_cases_run(self):
+        for name, setup in CASES.items():
+            with self.subTest(case=name):
+                setup()()
+
+    def test_threaded_run(self):
+        call = CASES["type_defs.type_family.isinstance"]()
+        self.assertGreater(run_threads(call, threads=4, duration=0.05), 0)
+
+        def fail():
+            raise ValueError("failed")
+        self.assertRaises(ValueError, run_threads, fail, threads=2, duration=1)
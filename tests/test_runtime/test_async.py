@@ -0,0 +1,194 @@
+from py_types.runtime import (
+    checked,
+    schema,
+    SchemaError,
+    typecheck,
+)
+
+import asyncio
+import inspect
+import unittest
+from collections.abc import (
+    AsyncGenerator,
+    AsyncIterator,
+)
+from contextlib import asynccontextmanager
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+async def collect(items):
+    return [item async for item in items]
+
+
+class AsyncCoroutineTestCase(unittest.TestCase):
+    """Tests for decorating coroutine functions"""
+    def test_wrappers_are_coroutine_functions(self):
+        for decorator in [typecheck, schema, checked]:
+            @decorator
+            async def fetch(a: int) -> int:
+                return a
+            self.assertTrue(inspect.iscoroutinefunction(fetch))
+            self.assertTrue(asyncio.iscoroutinefunction(fetch))
+
+    def test_awaited_result_is_checked(self):
+        for decorator in [typecheck, checked]:
+            @decorator
+            async def fetch(a: int, b) -> int:
+                await asyncio.sleep(0)
+                return b
+
+            self.assertEqual(run(fetch(1, 2)), 2)
+            self.assertRaises(TypeError, run, fetch(1, "2"))
+            self.assertRaises(TypeError, run, fetch("1", 2))
+
+    def test_awaited_schema_is_checked(self):
+        for decorator in [schema, schema(backend="codegen"), checked]:
+            @decorator
+            async def fetch(a: {"id": int}, name) -> {"id": int, "name": str}:
+                return {"id": a["id"], "name": name}
+
+            self.assertEqual(run(fetch({"id": 1}, "a")), {"id": 1, "name": "a"})
+            self.assertRaises(SchemaError, run, fetch({"id": 1}, 2))
+            self.assertRaises(SchemaError, run, fetch({"id": "1"}, "a"))
+
+    def test_sampled_coroutines(self):
+        @typecheck(sample=2)
+        async def fetch(a) -> int:
+            return a
+
+        results = []
+        for _ in range(4):
+            try:
+                run(fetch("a"))
+                results.append(True)
+            except TypeError:
+                results.append(False)
+        self.assertEqual(results, [True, False, True, False])
+        self.assertEqual(fetch.sampler.failures, 2)
+
+
+class AsyncGeneratorTestCase(unittest.TestCase):
+    """Tests for decorating async generator functions"""
+    def test_wrappers_are_async_generator_functions(self):
+        for decorator in [typecheck, schema, checked]:
+            @decorator
+            async def produce(a: int) -> int:
+                yield a
+            self.assertTrue(inspect.isasyncgenfunction(produce))
+
+    def test_each_item_is_checked(self):
+        for decorator in [typecheck, checked]:
+            @decorator
+            async def produce(count: int, bad_at=None) -> int:
+                for i in range(count):
+                    yield str(i) if i == bad_at else i
+
+            self.assertEqual(run(collect(produce(5))), [0, 1, 2, 3, 4])
+            self.assertRaises(TypeError, run, collect(produce(5, bad_at=3)))
+            self.assertRaises(TypeError, run, collect(produce("5")))
+
+    def test_each_item_matches_schema(self):
+        seen = []
+
+        @schema
+        async def produce(count, bad_at=None) -> {"id": int}:
+            for i in range(count):
+                seen.append(i)
+                yield {"id": str(i) if i == bad_at else i}
+
+        self.assertEqual(run(collect(produce(3))), [{"id": 0}, {"id": 1}, {"id": 2}])
+        del seen[:]
+        self.assertRaises(SchemaError, run, collect(produce(10, bad_at=4)))
+        self.assertEqual(seen, [0, 1, 2, 3, 4])
+
+    def test_closing_early_closes_the_generator(self):
+        closed = []
+
+        @typecheck
+        async def produce() -> int:
+            try:
+                for i in range(10):
+                    yield i
+            finally:
+                closed.append(True)
+
+        async def take_two():
+            items = produce()
+            result = [await items.__anext__(), await items.__anext__()]
+            await items.aclose()
+            return result
+
+        self.assertEqual(run(take_two()), [0, 1])
+        self.assertEqual(closed, [True])
+
+    def test_async_iterator_arguments_are_streamed(self):
+        async def rows(bad_at=None):
+            for i in range(5):
+                yield {"id": str(i) if i == bad_at else i}
+
+        @schema
+        async def total(items: [{"id": int}]) -> int:
+            return sum([item["id"] async for item in items])
+
+        self.assertEqual(run(total(rows())), 10)
+        with self.assertRaises(SchemaError) as context:
+            run(total(rows(bad_at=2)))
+        self.assertEqual(context.exception.key_path, [2, "id"])
+
+    def test_asend_and_athrow_reach_the_generator(self):
+        for decorator in [typecheck, checked]:
+            @decorator
+            async def echo() -> int:
+                received = 0
+                while True:
+                    try:
+                        received = yield received + 1
+                    except ValueError:
+                        received = -10
+
+            async def drive():
+                items = echo()
+                results = [await items.__anext__(), await items.asend(5), await items.athrow(ValueError())]
+                with self.assertRaises(TypeError):
+                    await items.asend("5")
+                return results
+
+            self.assertEqual(run(drive()), [1, 6, -9])
+
+    def test_async_context_managers(self):
+        log = []
+
+        @asynccontextmanager
+        @checked
+        async def transaction(name: str) -> int:
+            try:
+                yield 1
+            except ValueError:
+                log.append("rollback")
+                raise
+            else:
+                log.append("commit")
+
+        async def use(fail):
+            async with transaction("t") as value:
+                self.assertEqual(value, 1)
+                if fail:
+                    raise ValueError("failed")
+
+        run(use(False))
+        self.assertRaises(ValueError, run, use(True))
+        self.assertEqual(log, ["commit", "rollback"])
+
+    def test_async_iterator_annotations_describe_the_generator(self):
+        for decorator in [typecheck, checked]:
+            for annotation in [AsyncIterator, AsyncGenerator]:
+                @decorator
+                async def produce(count: int) -> annotation:
+                    for i in range(count):
+                        yield str(i)
+
+                self.assertEqual(run(collect(produce(2))), ["0", "1"])
+                self.assertRaises(TypeError, run, collect(produce("2")))
@@ -0,0 +1,107 @@
+from py_types.runtime import (
+    SchemaOr,
+    SchemaError,
+    validate_many,
+)
+
+from py_types.type_defs.common import Number
+
+import pickle
+import unittest
+
+
+record_schema = {
+    "id": int,
+    "name": str,
+    "tags": [str],
+    "owner": SchemaOr(type(None), {"id": int}),
+    "score": Number,
+}
+
+
+def good_record(i):
+    return {"id": i, "name": "record {}".format(i), "tags": ["a", "b"], "owner": {"id": i}, "score": i / 2}
+
+
+class ValidateManyTestCase(unittest.TestCase):
+    """Tests for py_types.runtime.batch.validate_many"""
+    def setUp(self):
+        self.records = [good_record(i) for i in range(10)]
+        self.records[3]["tags"].append(3)
+        self.records[7]["owner"] = "nobody"
+        del self.records[8]["name"]
+
+    def test_all_pass(self):
+        for backend in ["closures", "codegen"]:
+            result = validate_many(record_schema, (good_record(i) for i in range(100)), backend=backend)
+            self.assertTrue(result)
+            self.assertEqual(len(result), 100)
+            self.assertEqual(result.passed, bytearray([1]) * 100)
+            self.assertEqual(result.failed_indices, [])
+            self.assertEqual(list(result.errors()), [])
+            result.raise_first()
+
+    def test_failures(self):
+        for backend in ["closures", "codegen"]:
+            result = validate_many(record_schema, self.records, backend=backend)
+            self.assertFalse(result)
+            self.assertEqual(result.failed_indices, [3, 7, 8])
+            self.assertEqual([i for i, ok in enumerate(result.passed) if not ok], [3, 7, 8])
+            self.assertIsNone(result.error(0))
+
+            error = result.error(3)
+            self.assertIsInstance(error, SchemaError)
+            self.assertEqual(error.key_path, ["tags", 2])
+            self.assertIn("records[3]['tags'][2]", str(error))
+            self.assertIn("SchemaOr", str(result.error(7)))
+            self.assertIn("'name'", str(result.error(-2)))
+            self.assertEqual([i for i, _ in result.errors()], [3, 7, 8])
+            with self.assertRaises(SchemaError):
+                result.raise_first()
+
+    def test_matches_single_checks(self):
+        """Test that each record passes or fails exactly as it would in a decorated function."""
+        from py_types.runtime.schema import _assert_format_matches
+        result = validate_many(record_schema, self.records)
+        for record, ok in zip(self.records, result.passed):
+            if ok:
+                _assert_format_matches(record_schema, record)
+            else:
+                with self.assertRaises(SchemaError):
+                    _assert_format_matches(record_schema, record)
+
+    def test_process_pool(self):
+        """Test that records checked in worker processes give the same result, in order."""
+        records = [good_record(i) for i in range(50)] + self.records + [good_record(i) for i in range(50)]
+        records[20]["score"] = "high"
+        expected = validate_many(record_schema, records)
+        for backend in ["closures", "codegen"]:
+            result = validate_many(record_schema, iter(records), backend=backend, workers=2, chunk_size=7)
+            self.assertEqual(result.passed, expected.passed)
+            self.assertEqual(result.failed_indices, [20, 53, 57, 58])
+            self.assertEqual(str(result.error(53)), str(expected.error(53)))
+            self.assertEqual(result.error(20).key_path, ["score"])
+
+    def test_codegen_falls_back_to_closures(self):
+        """Test that records the generated validator turns down, like sets for list schemas, still pass."""
+        form = {"tags": SchemaOr([str], type(None))}
+        records = [{"tags": {"a"}}, {"tags": None}, {"tags": {1}}]
+        for workers in [None, 2]:
+            for backend in ["closures", "codegen"]:
+                result = validate_many(form, records, backend=backend, workers=workers)
+                self.assertEqual(list(result.passed), [1, 1, 0])
+                self.assertEqual(result.failed_indices, [2])
+                self.assertIsInstance(result.error(2), SchemaError)
+
+    def test_schema_errors_pickle(self):
+        result = validate_many(record_schema, self.records)
+        for _, error in result.errors():
+            copied = pickle.loads(pickle.dumps(error))
+            self.assertIsInstance(copied, SchemaError)
+            self.assertEqual(str(copied), str(error))
+            self.assertEqual(copied.key_path, error.key_path)
+
+    def test_bad_backend(self):
+        with self.assertRaises(ValueError):
+            validate_many(record_schema, [], backend="fast")
+
@@ -0,0 +1,121 @@
+from py_types.runtime import (
+    checked,
+    configure,
+    schema,
+    typecheck,
+)
+from py_types.runtime import config
+from py_types.runtime.schema import SchemaError
+
+import unittest
+from copy import deepcopy
+
+
+def plain(a: int) -> {"b": int}:
+    return {"b": a}
+
+
+class ConfigTestCase(unittest.TestCase):
+    """Tests for py_types.runtime.config"""
+    def setUp(self):
+        self.settings = deepcopy(config._settings)
+
+    def tearDown(self):
+        config._settings.clear()
+        config._settings.update(self.settings)
+
+    def test_off_returns_function_unchanged(self):
+        configure(mode="off")
+        for decorator in [typecheck, schema, checked, typecheck(), schema(backend="codegen")]:
+            self.assertIs(decorator(plain), plain)
+
+    def test_on_wraps(self):
+        configure(mode="on")
+        for decorator in [typecheck, schema, checked]:
+            self.assertIsNot(decorator(plain), plain)
+
+    def test_function_mode_overrides_global(self):
+        configure(mode="off")
+        wrapped = checked(mode="on")(plain)
+        self.assertIsNot(wrapped, plain)
+        self.assertRaises(TypeError, wrapped, "1")
+
+        configure(mode="on")
+        self.assertIs(schema(mode="off")(plain), plain)
+
+    def test_module_mode_overrides_global(self):
+        configure(mode="off", modules={"tests.test_runtime": "on", "tests.test_runtime.test_config": "off"})
+        self.assertIs(typecheck(plain), plain)
+
+        configure(modules={"tests.test_runtime.test_config": None})
+        self.assertIsNot(typecheck(plain), plain)
+
+        configure(modules={"tests.test_runtime": None, "tests.test_run": "on"})
+        self.assertIs(typecheck(plain), plain)
+
+    def test_unknown_mode_throws(self):
+        self.assertRaises(ValueError, configure, mode="sometimes")
+        self.assertRaises(ValueError, configure, modules={"tests": "sometimes"})
+        self.assertRaises(ValueError, typecheck, plain, mode="sometimes")
+
+
+class SamplingTestCase(unittest.TestCase):
+    """Tests for sampled checks"""
+    def setUp(self):
+        self.settings = deepcopy(config._settings)
+
+    def tearDown(self):
+        config._settings.clear()
+        config._settings.update(self.settings)
+
+    def count_failures(self, function, calls, error=TypeError):
+        failures = 0
+        for _ in range(calls):
+            try:
+                function("not an int")
+            except error:
+                failures += 1
+        return failures
+
+    def test_one_in_n(self):
+        sampled = typecheck(sample=10)(plain)
+        self.assertEqual(self.count_failures(sampled, 100), 10)
+        self.assertEqual(sampled.sampler.checks, 10)
+
+    def test_probability(self):
+        sampled = schema(sample=0.25)(plain)
+        self.assertEqual(self.count_failures(sampled, 100, SchemaError), 25)
+
+    def test_sample_mode(self):
+        configure(mode="sample", sample=5)
+        sampled = checked(plain)
+        self.assertEqual(self.count_failures(sampled, 100), 20)
+        self.assertIsNot(checked(mode="on")(plain), plain)
+        self.assertFalse(hasattr(checked(mode="on")(plain), "sampler"))
+
+    def test_adaptive_backoff(self):
+        sampled = typecheck(sample=2, adaptive=True)(plain)
+        sampler = sampled.sampler
+        for _ in range(sampler.backoff_after * 2):
+            sampled(1)
+        self.assertEqual(sampler.every, 4)
+
+        for _ in range(sampler.backoff_after * 500):
+            sampled(1)
+        self.assertEqual(sampler.every, 2 * sampler.max_factor)
+
+        self.assertEqual(self.count_failures(sampled, sampler.every), 1)
+        self.assertEqual(sampler.every, 2)
+        self.assertEqual(sampler.failures, 1)
+
+    def test_errors_from_function_are_not_failures(self):
+        @typecheck(sample=1)
+        def raises(a: int):
+            raise TypeError("not from a check")
+
+        self.assertRaises(TypeError, raises, 1)
+        self.assertEqual(raises.sampler.failures, 0)
+
+    def test_invalid_sample_rates_throw(self):
+        for sample in [0, -1, 0., 1.5, True, "x"]:
+            self.assertRaises(ValueError, typecheck, plain, sample=sample)
@@ -0,0 +1,151 @@
+from py_types.runtime import (
+    schema,
+    SchemaAllowExtra,
+    SchemaError,
+    SchemaOr,
+)
+from py_types.runtime.json_schema import (
+    from_json_schema,
+    load_compiled_schema,
+    save_compiled_schema,
+    to_json_schema,
+)
+from py_types.runtime.schema import (
+    _assert_format_matches,
+    _generate_validator,
+)
+from py_types.type_defs.base import ValidatedType
+from py_types.type_defs.common import Number
+
+import json
+import os
+import tempfile
+import unittest
+
+
+test_schema = {
+    "hello": int,
+    "world": {
+        "people": [str],
+        "version": Number,
+        "location": [float, float],
+    },
+    "optional": SchemaOr(int, type(None)),
+    "extra": SchemaAllowExtra({"kind": str}),
+}
+
+matching = [
+    {"hello": 1, "world": {"people": ["a"], "version": 2, "location": [1.5, 2.5]}, "extra": {"kind": "x"}},
+    {"hello": 1, "world": {"people": [], "version": 2.5, "location": [1.5, 2.5]}, "optional": 3,
+     "extra": {"kind": "x", "more": [1]}},
+]
+
+not_matching = [
+    {"hello": "1", "world": {"people": ["a"], "version": 2, "location": [1.5, 2.5]}, "extra": {"kind": "x"}},
+    {"hello": 1, "world": {"people": [1], "version": 2, "location": [1.5, 2.5]}, "extra": {"kind": "x"}},
+    {"hello": 1, "world": {"people": ["a"], "version": 2, "location": [1.5]}, "extra": {"kind": "x"}},
+    {"hello": 1, "world": {"people": ["a"], "version": 2, "location": [1.5, 2.5]}, "extra": {"kind": "x"}, "no": 1},
+    {"hello": 1, "world": {"people": ["a"], "version": 2, "location": [1.5, 2.5]}, "extra": {}},
+    {"hello": 1, "world": {"people": ["a"], "version": 2, "location": [1.5, 2.5]}, "optional": "3", "extra": {"kind": "x"}},
+]
+
+
+def matches(form, data):
+    try:
+        _assert_format_matches(form, data)
+    except SchemaError:
+        return False
+    return True
+
+
+class JsonSchemaTestCase(unittest.TestCase):
+    """Tests for py_types.runtime.json_schema"""
+    def test_to_json_schema(self):
+        document = to_json_schema({"a": int, "b": SchemaOr(str, type(None)), "c": [float]})
+        self.assertEqual(document, {
+            "$schema": "https://json-schema.org/draft/2020-12/schema",
+            "type": "object",
+            "properties": {
+                "a": {"type": "integer"},
+                "b": {"anyOf": [{"type": "string"}, {"type": "null"}]},
+                "c": {"type": "array", "items": {"type": "number"}},
+            },
+            "required": ["a", "c"],
+            "additionalProperties": False,
+        })
+        self.assertEqual(to_json_schema([int, str])["prefixItems"], [{"type": "integer"}, {"type": "string"}])
+        self.assertEqual(to_json_schema(Number)["anyOf"], [{"type": "integer"}, {"type": "number"}])
+        json.dumps(to_json_schema(test_schema))
+
+    def test_round_trip(self):
+        form = from_json_schema(to_json_schema(test_schema))
+        for data in matching:
+            self.assertTrue(matches(form, data), data)
+        for data in not_matching:
+            self.assertFalse(matches(form, data), data)
+
+    def test_from_json_schema(self):
+        form = from_json_schema({
+            "type": "object",
+            "properties": {"id": {"type": "integer"}, "tags": {"type": "array", "items": {"type": "string"}},
+                           "note": {"type": ["string", "null"]}, "size": {"type": "number"}},
+            "required": ["id", "size"],
+        })
+        self.assertTrue(matches(form, {"id": 1, "size": 2}))
+        self.assertTrue(matches(form, {"id": 1, "size": 2.5, "tags": ["a"], "note": None, "other": True}))
+        self.assertFalse(matches(form, {"id": 1}))
+        self.assertFalse(matches(form, {"id": 1, "size": 2, "tags": [1]}))
+        self.assertEqual(from_json_schema({}), object)
+        self.assertEqual(from_json_schema({"type": "object"}), dict)
+
+    def test_untranslatable(self):
+        class Positive(metaclass=ValidatedType):
+            type_members = [int]
+            validators = [lambda value: value > 0]
+
+        for form in [Positive, {1: int}, complex]:
+            self.assertRaises(ValueError, to_json_schema, form)
+        for document in [{"type": "integer", "minimum": 1}, {"$ref": "#/x"}, {"type": "thing"},
+                         {"type": "object", "additionalProperties": {"type": "integer"}}]:
+            self.assertRaises(ValueError, from_json_schema, document)
+
+
+class CompiledSchemaTestCase(unittest.TestCase):
+    """Tests for saving and loading compiled schemas"""
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".json")
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+
+    def check_compiled(self, compiled):
+        for data in matching:
+            self.assertTrue(compiled.matches(data))
+            compiled.validate(data)
+        for data in not_matching:
+            self.assertFalse(compiled.matches(data))
+            self.assertRaises(SchemaError, compiled.validate, data)
+
+    def test_save_and_load(self):
+        self.check_compiled(save_compiled_schema(test_schema, self.path))
+        loaded = load_compiled_schema(self.path)
+        self.check_compiled(loaded)
+        self.assertIs(_generate_validator(loaded.form), loaded.validator)
+
+        @schema(backend="codegen")
+        def function(a: loaded.form):
+            pass
+        function(matching[0])
+        self.assertRaises(SchemaError, function, not_matching[0])
+
+        with open(self.path) as f:
+            self.assertEqual(json.load(f)["json_schema"], to_json_schema(test_schema))
+
+    def test_other_python_versions_recompile(self):
+        save_compiled_schema(test_schema, self.path)
+        with open(self.path) as f:
+            artifact = json.load(f)
+        artifact["cache_tag"] = "other-python"
+        artifact["code"] = ""
+        with open(self.path, "w") as f:
+            json.dump(artifact, f)
+        self.check_compiled(load_compiled_schema(self.path))
@@ -0,0 +1,117 @@
+from py_types.runtime import (
+    configure,
+    schema,
+    SchemaError,
+    typecheck,
+)
+from py_types.runtime import (
+    config,
+    metrics,
+)
+
+import asyncio
+import json
+import threading
+import unittest
+from copy import deepcopy
+
+
+class MetricsTestCase(unittest.TestCase):
+    """Tests for py_types.runtime.metrics"""
+    def setUp(self):
+        self.settings = deepcopy(config._settings)
+        metrics.reset()
+
+    def tearDown(self):
+        config._settings.clear()
+        config._settings.update(self.settings)
+        metrics.reset()
+
+    def test_off_by_default(self):
+        @typecheck
+        def unmeasured(a: int) -> int:
+            return a
+
+        unmeasured(1)
+        self.assertFalse(hasattr(unmeasured.__wrapped__, "__wrapped__"))
+        self.assertNotIn(unmeasured.__qualname__, "".join(metrics.snapshot()))
+
+    def test_counts(self):
+        configure(metrics=True)
+
+        @schema
+        def measured(a: {"b": int}) -> {"b": int}:
+            return a
+
+        measured({"b": 1})
+        measured({"b": 2})
+        self.assertRaises(SchemaError, measured, {"b": "3"})
+        self.assertFalse(hasattr(measured.__wrapped__, "__wrapped__"))
+
+        stats = metrics.snapshot()["{}.{}".format(__name__, measured.__qualname__)]
+        self.assertEqual(stats["calls"], 3)
+        self.assertEqual(stats["checks"], 5)
+        self.assertEqual(stats["failures"], 1)
+        self.assertGreater(stats["validation_ns"], 0)
+        self.assertGreater(stats["body_ns"], 0)
+        for percentile in metrics.PERCENTILES:
+            self.assertGreater(stats["validation_p{}_ns".format(percentile)], 0)
+
+    def test_sampled_and_async_counts(self):
+        configure(metrics=True)
+
+        @typecheck(sample=2)
+        def sampled(a: int) -> int:
+            return a
+
+        @typecheck
+        async def fetch(a: int) -> int:
+            return a
+
+        for i in range(10):
+            sampled(i)
+            asyncio.run(fetch(i))
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["{}.{}".format(__name__, sampled.__qualname__)]["calls"], 10)
+        self.assertEqual(snapshot["{}.{}".format(__name__, sampled.__qualname__)]["checks"], 10)
+        self.assertEqual(snapshot["{}.{}".format(__name__, fetch.__qualname__)]["checks"], 20)
+        self.assertTrue(asyncio.iscoroutinefunction(fetch))
+
+    def test_threads_are_combined(self):
+        configure(metrics=True)
+
+        @typecheck
+        def threaded(a: int) -> int:
+            return a
+
+        def call_many():
+            for i in range(1000):
+                threaded(i)
+
+        threads = [threading.Thread(target=call_many) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = metrics.snapshot()["{}.{}".format(__name__, threaded.__qualname__)]
+        self.assertEqual(stats["calls"], 4000)
+        self.assertEqual(stats["checks"], 8000)
+
+    def test_dumps(self):
+        configure(metrics=True)
+
+        @typecheck
+        def dumped(a: int) -> int:
+            return a
+
+        dumped(1)
+        name = "{}.{}".format(__name__, dumped.__qualname__)
+        self.assertEqual(json.loads(metrics.to_json())[name]["calls"], 1)
+
+        text = metrics.to_prometheus()
+        self.assertIn("# TYPE py_types_checks_total counter", text)
+        self.assertIn('py_types_checks_total{{function="{}"}} 2'.format(name), text)
+        self.assertIn('py_types_validation_seconds{{function="{}",quantile="0.5"}}'.format(name), text)
+        self.assertIn('py_types_body_seconds_count{{function="{}"}} 1'.format(name), text)
@@ -0,0 +1,118 @@
+from py_types.runtime import (
+    checked,
+    schema,
+    SchemaError,
+    validate_json_lines,
+    validate_stream,
+)
+
+import io
+import json
+import os
+import tempfile
+import unittest
+
+
+record_schema = {"id": int, "name": str}
+
+
+def records(count, bad_at=None):
+    for i in range(count):
+        if i == bad_at:
+            yield {"id": str(i), "name": "bad"}
+        else:
+            yield {"id": i, "name": "record {}".format(i)}
+
+
+class StreamingSchemaTestCase(unittest.TestCase):
+    """Tests for iterators passed to homogenous list schemas"""
+    def test_generator_is_checked_as_consumed(self):
+        for decorator in [schema, schema(backend="codegen"), checked]:
+            @decorator
+            def total(rows: [record_schema]) -> int:
+                return sum(row["id"] for row in rows)
+
+            self.assertEqual(total(records(100)), sum(range(100)))
+            self.assertEqual(total(rows=records(10)), sum(range(10)))
+            self.assertEqual(total(list(records(10))), sum(range(10)))
+
+            with self.assertRaises(SchemaError) as context:
+                total(records(100, bad_at=42))
+            self.assertEqual(context.exception.key_path, [42, "id"])
+            self.assertRaises(SchemaError, total, list(records(10, bad_at=3)))
+
+    def test_items_before_the_bad_one_are_passed_through(self):
+        seen = []
+
+        @schema
+        def consume(rows: [record_schema]):
+            for row in rows:
+                seen.append(row["id"])
+
+        self.assertRaises(SchemaError, consume, records(10, bad_at=5))
+        self.assertEqual(seen, [0, 1, 2, 3, 4])
+
+    def test_returned_generator_is_checked(self):
+        @schema
+        def produce(count, bad_at=None) -> [record_schema]:
+            return records(count, bad_at)
+
+        self.assertEqual(len(list(produce(10))), 10)
+        stream = produce(10, bad_at=8)
+        self.assertEqual(next(stream)["id"], 0)
+        self.assertRaises(SchemaError, list, stream)
+
+    def test_sampled_streams(self):
+        @schema(sample=1)
+        def total(rows: [record_schema]) -> int:
+            return sum(row["id"] for row in rows)
+
+        self.assertEqual(total(records(10)), sum(range(10)))
+        self.assertRaises(SchemaError, total, records(10, bad_at=9))
+
+    def test_variadic_arguments_are_streamed(self):
+        for decorator in [schema, checked]:
+            @decorator
+            def totals(*groups: [record_schema], **named: [record_schema]) -> int:
+                return sum(row["id"] for rows in list(groups) + list(named.values()) for row in rows)
+
+            self.assertEqual(totals(records(3), records(4), other=records(5)), 3 + 6 + 10)
+            self.assertRaises(SchemaError, totals, records(3), records(4, bad_at=2))
+            self.assertRaises(SchemaError, totals, records(3), other=records(4, bad_at=2))
+            self.assertRaises(SchemaError, totals, [{"id": "1", "name": "a"}])
+
+    def test_validate_stream(self):
+        self.assertEqual(len(list(validate_stream(record_schema, records(50)))), 50)
+        with self.assertRaises(SchemaError) as context:
+            list(validate_stream(record_schema, records(50, bad_at=7), backend="codegen"))
+        self.assertIn("items[7]['id']", str(context.exception))
+
+
+class JsonLinesTestCase(unittest.TestCase):
+    """Tests for py_types.runtime.stream.validate_json_lines"""
+    def lines(self, bad_at=None):
+        return "".join(json.dumps(record) + "\n" for record in records(20, bad_at)) + "\n"
+
+    def test_file_object(self):
+        self.assertEqual(len(list(validate_json_lines(record_schema, io.StringIO(self.lines())))), 20)
+        with self.assertRaises(SchemaError) as context:
+            list(validate_json_lines(record_schema, io.StringIO(self.lines(bad_at=4)), name="export"))
+        self.assertEqual(context.exception.key_path, [5, "id"])
+        self.assertIn("export[5]['id']", str(context.exception))
+
+    def test_path(self):
+        handle, path = tempfile.mkstemp(suffix=".jsonl")
+        self.addCleanup(os.remove, path)
+        with os.fdopen(handle, "w") as f:
+            f.write(self.lines(bad_at=19))
+
+        stream = validate_json_lines(record_schema, path)
+        self.assertEqual(next(stream), {"id": 0, "name": "record 0"})
+        with self.assertRaises(SchemaError) as context:
+            list(stream)
+        self.assertIn("{}[20]".format(path), str(context.exception))
+
+    def test_invalid_json(self):
+        lines = io.StringIO('{"id": 1, "name": "a"}\n{"id": \n')
+        with self.assertRaisesRegex(ValueError, "line 2"):
+            list(validate_json_lines(record_schema, lines))
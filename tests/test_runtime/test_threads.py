@@ -0,0 +1,104 @@
+from py_types.runtime import (
+    schema,
+    SchemaError,
+    ValidationCache,
+)
+from py_types.runtime.schema import (
+    _compile_schema,
+    _generate_validator,
+)
+from py_types.type_defs.base import TypeFamily
+
+from abc import ABC
+import threading
+import unittest
+
+
+THREADS = 8
+
+
+def run_together(target, threads=THREADS):
+    """Run target(index) in threads threads, started together, and raise the first exception any of them raised."""
+    start_line = threading.Barrier(threads)
+    errors = []
+
+    def worker(index):
+        start_line.wait()
+        try:
+            target(index)
+        except BaseException as error:
+            errors.append(error)
+
+    workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    if errors:
+        raise errors[0]
+
+
+class ThreadsTestCase(unittest.TestCase):
+    """Tests for sharing checkers and caches between threads"""
+    def test_compiled_checkers_are_published_once(self):
+        forms = [{"a": [int], "b": (str, float)} for _ in range(50)]
+        checkers = [[] for _ in range(THREADS)]
+        validators = [[] for _ in range(THREADS)]
+
+        def compile_all(index):
+            for form in forms:
+                checkers[index].append(_compile_schema(form))
+                validators[index].append(_generate_validator(form))
+
+        run_together(compile_all)
+        for index in range(1, THREADS):
+            self.assertTrue(all(a is b for a, b in zip(checkers[0], checkers[index])))
+            self.assertTrue(all(a is b for a, b in zip(validators[0], validators[index])))
+
+    def test_checks_from_many_threads(self):
+        @schema(backend="codegen")
+        def function(a: {"values": [int]}) -> int:
+            return len(a["values"])
+
+        def call(index):
+            for i in range(200):
+                self.assertEqual(function({"values": list(range(i))}), i)
+                self.assertRaises(SchemaError, function, {"values": [index, "bad"]})
+
+        run_together(call)
+
+    def test_type_family_verdicts_follow_abc_registrations(self):
+        class Base(ABC):
+            pass
+
+        class Family(metaclass=TypeFamily):
+            type_members = [Base]
+
+        registered = [type("Registered{}".format(i), (), {}) for i in range(50)]
+
+        def check(index):
+            for cls in registered:
+                if index == 0:
+                    Base.register(cls)
+                isinstance(cls(), Family)
+
+        run_together(check)
+        for cls in registered:
+            self.assertTrue(isinstance(cls(), Family))
+
+    def test_cache_counts_merge_across_threads(self):
+        cache = ValidationCache(maxsize=16)
+        values = [tuple(range(i)) for i in range(1, 33)]
+        check = object()
+
+        def use(index):
+            for value in values:
+                if not cache.passed(check, value):
+                    cache.add(check, value)
+
+        run_together(use)
+        info = cache.info()
+        self.assertEqual(info.hits + info.misses, THREADS * len(values))
+        self.assertEqual(info.currsize, 16)
+        cache.clear()
+        self.assertEqual(cache.info(), (0, 0, 16, 0))
@@ -0,0 +1,160 @@
+from py_types.runtime import (
+    schema,
+    SchemaError,
+    track,
+    TrackedDict,
+    TrackedList,
+)
+
+import pickle
+import unittest
+from copy import deepcopy
+
+from .counting import (
+    checked_values,
+    Value,
+)
+
+
+test_schema = {
+    "hello": Value,
+    "world": {
+        "people": [Value],
+        "version": int,
+    },
+}
+
+
+@schema
+def first_hop(a: test_schema) -> test_schema:
+    return a
+
+
+@schema(backend="codegen")
+def second_hop(a: test_schema) -> test_schema:
+    return a
+
+
+class TrackedTestCase(unittest.TestCase):
+    """Tests for py_types.runtime.tracked"""
+    def setUp(self):
+        self.data = track({"hello": 5, "world": {"people": ["Alice", "Bob", "Carol"], "version": 1}})
+        del checked_values[:]
+
+    def test_track_converts_containers(self):
+        data = track({"a": [{"b": 1}, ({"c": []},)]})
+        self.assertIs(type(data), TrackedDict)
+        self.assertIs(type(data["a"]), TrackedList)
+        self.assertIs(type(data["a"][0]), TrackedDict)
+        self.assertIs(type(data["a"][1][0]["c"]), TrackedList)
+        self.assertEqual(data, {"a": [{"b": 1}, ({"c": []},)]})
+        data["a"].append({"d": [1]})
+        self.assertIs(type(data["a"][2]["d"]), TrackedList)
+
+    def test_unchanged_data_is_checked_once(self):
+        first_hop(self.data)
+        self.assertEqual(checked_values, [5, "Alice", "Bob", "Carol"])
+        del checked_values[:]
+        first_hop(self.data)
+        second_hop(self.data)
+        self.assertEqual(checked_values, [])
+
+    def test_only_written_paths_are_checked_again(self):
+        first_hop(self.data)
+        del checked_values[:]
+
+        self.data["world"]["version"] += 1
+        second_hop(self.data)
+        # The top-level dict and "world" are checked again, but not the list of people.
+        self.assertEqual(checked_values, [5])
+
+        del checked_values[:]
+        self.data["world"]["people"][1] = "Bobby"
+        first_hop(self.data)
+        self.assertEqual(checked_values, [5, "Alice", "Bobby", "Carol"])
+
+    def test_bad_writes_are_caught(self):
+        first_hop(self.data)
+        self.data["world"]["people"].append(None)
+        self.assertRaises(SchemaError, first_hop, self.data)
+        self.assertRaises(SchemaError, second_hop, self.data)
+        self.data["world"]["people"].pop()
+        first_hop(self.data)
+
+        self.data["world"].update(extra=1)
+        self.assertRaises(SchemaError, second_hop, self.data)
+        del self.data["world"]["extra"]
+        self.data["world"].setdefault("version", "not used")
+        second_hop(self.data)
+        self.data["world"]["people"] = ("not", "a", "list", object())
+        self.assertRaises(SchemaError, first_hop, self.data)
+
+    def test_shared_containers_invalidate_every_parent(self):
+        people = track(["Alice"])
+        first = track({"hello": 1, "world": {"people": people, "version": 1}})
+        second = track({"hello": 2, "world": {"people": people, "version": 1}})
+        first_hop(first)
+        first_hop(second)
+        people.append(None)
+        self.assertRaises(SchemaError, first_hop, first)
+        self.assertRaises(SchemaError, first_hop, second)
+
+    def test_removed_containers_forget_their_parents(self):
+        people = self.data["world"]["people"]
+        world = self.data["world"]
+        first_hop(self.data)
+        world["people"] = ["Dave"]
+        self.assertEqual(people._parents, {})
+        first_hop(self.data)
+        del checked_values[:]
+        # Writing to the old list no longer affects the data it was taken out of.
+        people.append(None)
+        first_hop(self.data)
+        self.assertEqual(checked_values, [])
+
+        removals = [
+            lambda container, child: container.pop("child"),
+            lambda container, child: container.popitem(),
+            lambda container, child: container.clear(),
+            lambda container, child: container.__delitem__("child"),
+        ]
+        for remove in removals:
+            container = track({"child": [1]})
+            child = container["child"]
+            remove(container, child)
+            self.assertEqual(child._parents, {})
+
+        child = track([1])
+        container = track([child, (child,), child])
+        container.pop()
+        container.remove(child)
+        self.assertIn(id(container), child._parents)
+        container[0] = None
+        self.assertEqual(child._parents, {})
+        container = track([child])
+        container *= 3
+        del container[:2]
+        self.assertIn(id(container), child._parents)
+        container *= 0
+        self.assertEqual(child._parents, {})
+
+    def test_copies(self):
+        first_hop(self.data)
+        copied = deepcopy(self.data)
+        self.assertIs(type(copied["world"]["people"]), TrackedList)
+        del checked_values[:]
+        first_hop(copied)
+        self.assertEqual(checked_values, [])
+
+        copied["world"]["people"].append(None)
+        self.assertRaises(SchemaError, first_hop, copied)
+        del checked_values[:]
+        first_hop(self.data)
+        self.assertEqual(checked_values, [])
+
+    def test_pickling(self):
+        copied = pickle.loads(pickle.dumps(self.data))
+        self.assertIs(type(copied), TrackedDict)
+        self.assertIs(type(copied["world"]["people"]), TrackedList)
+        self.assertEqual(copied, self.data)
+        first_hop(copied)
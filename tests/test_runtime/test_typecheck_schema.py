@@ -1,14 +1,23 @@
 from py_types.runtime import (
+    checked,
     typecheck,
 )
+from py_types.type_defs.common import Number
+from py_types.type_defs.structured_types import TypedSequence
 from py_types.runtime.schema import (
     schema,
     SchemaOr,
-    SchemaError
+    SchemaAllowExtra,
+    SchemaError,
+    _generate_validator,
+    _generated_validators,
 )
 
+import functools
+import sys
 import unittest
 from copy import deepcopy
+from unittest import mock
 
 
 #----------------------
@@ -92,6 +101,56 @@ class TypecheckTestCase(unittest.TestCase):
         takes_ints("h", "b")
         takes_ints({"hello": "there"}, ["bob"])
 
+    def test_keyword_and_variadic_args(self):
+        """Test that arguments are matched to their annotations however they're passed."""
+        @typecheck
+        def many_args(a, b: int, *rest: str, c: float = 1., **others: bool) -> None:
+            pass
+
+        many_args("anything", 1, "x", "y", c=2., flag=True)
+        many_args(None, b=1)
+        self.assertRaises(TypeError, many_args, None, "1")
+        self.assertRaises(TypeError, many_args, None, b="1")
+        self.assertRaises(TypeError, many_args, None, 1, "x", 2)
+        self.assertRaises(TypeError, many_args, None, 1, c=2)
+        self.assertRaises(TypeError, many_args, None, 1, flag="yes")
+
+    def test_locals_are_not_arguments(self):
+        """Regression test where locals of the function were matched up with extra positional arguments."""
+        @typecheck
+        def with_locals(a: int, *rest):
+            local_value = "a"
+            return local_value
+
+        with_locals(1, "not an int")
+
+    def test_stacked_with_schema(self):
+        """Test that typecheck finds the argument names of a function already wrapped by schema."""
+        @typecheck
+        @schema
+        def stacked(a: int, b: {"c": str}):
+            pass
+
+        stacked(1, {"c": "d"})
+        self.assertRaises(TypeError, stacked, "1", {"c": "d"})
+        self.assertRaises(SchemaError, stacked, 1, {"c": 2})
+
+    def test_other_decorators_keep_their_signature(self):
+        """Test that functions wrapped by other decorators are checked by the arguments their wrapper takes."""
+        def with_request(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                return view("request", *args, **kwargs)
+            return wrapper
+
+        for decorator in [typecheck, checked]:
+            @decorator
+            @with_request
+            def view(request: str, x: int):
+                return x
+
+            self.assertEqual(view(5), 5)
+
 
 class SchemaTestCase(unittest.TestCase):
     """Tests for py_types.runtime.schema"""
@@ -255,6 +314,41 @@ class SchemaTestCase(unittest.TestCase):
         self.assertRaises(SchemaError, test_function_nd, [2, "a"])
         self.assertRaises(SchemaError, test_function_nd, None)
 
+    def test_schemaor_only_tries_plausible_alternatives(self):
+        """Test that dict schemas in a SchemaOr aren't tried on non-dicts, nor list schemas on non-iterables."""
+        checked_values = []
+
+        class Counted(type):
+            def __instancecheck__(cls, instance):
+                checked_values.append(instance)
+                return isinstance(instance, int)
+
+        class Count(metaclass=Counted):
+            pass
+
+        @schema
+        def test_function(count_struct: SchemaOr({"a": Count}, [Count], str)):
+            pass
+
+        del checked_values[:]
+        test_function("abc")
+        test_function([1, 2])
+        self.assertEqual(checked_values, [1, 2])
+        test_function({"a": 3})
+        self.assertEqual(checked_values, [1, 2, 3])
+        del checked_values[:]
+
+        with self.assertRaises(SchemaError) as context:
+            test_function(5.)
+        self.assertEqual(checked_values, [])
+        message = str(context.exception)
+        self.assertLess(message.index("schema 0"), message.index("schema 1"))
+        self.assertLess(message.index("schema 1"), message.index("schema 2"))
+
+    def test_schemaor_of_types_is_one_isinstance(self):
+        self.assertIn("isinstance(v0, _c", _generate_validator(SchemaOr(int, type(None))).source)
+        self.assertNotIn("_validate", _generate_validator(SchemaOr(int, type(None))).source.split("\n", 1)[1])
+
     def test_nested_tuples(self):
         """Test that tuples in schemas are treated as iterables/lists and not as sum types/values
         (basically, test that they don't get passed to isinstance)
@@ -267,3 +361,242 @@ class SchemaTestCase(unittest.TestCase):
         test_function_nt({"test": [3, "right"]})
         self.assertRaises(SchemaError, test_function_nt, {"test": 5})
         self.assertRaises(SchemaError, test_function_nt, {"test": "middle"})
+
+    def test_nested_heterogenous_length_is_checked(self):
+        """Regression test where a one-item list was checked against only the first
+        member of a nested heterogenous schema."""
+        @schema
+        def test_function_nhl(count_struct: {"test": (int, str)}):
+            pass
+
+        self.assertRaises(SchemaError, test_function_nhl, {"test": (5,)})
+        self.assertRaises(SchemaError, test_function_nhl, {"test": ["left"]})
+
+    def test_schema_is_compiled_at_decoration(self):
+        """Test that the annotation is read once, when the function is decorated."""
+        test_schema = {"a": int}
+
+        @schema
+        def test_function(arg: test_schema):
+            pass
+
+        test_schema["a"] = str
+        test_function({"a": 5})
+        self.assertRaises(SchemaError, test_function, {"a": "5"})
+
+    def test_error_key_paths(self):
+        """Regression test where the key path given in errors was built from a list shared between sibling keys."""
+        @schema
+        def test_function(arg: {"first": {"a": int}, "second": [{"b": [int]}], "third": (int, str)}):
+            pass
+
+        valid = {"first": {"a": 1}, "second": [{"b": [1]}, {"b": [2, 3]}], "third": (1, "a")}
+        test_function(valid)
+        cases = [
+            ({"first": {"a": "1"}}, ["first", "a"]),
+            ({"second": [{"b": [1]}, {"b": [2, "3"]}]}, ["second", 1, "b", 1]),
+            ({"second": [{"b": [1]}, {}]}, ["second", 1]),
+            ({"third": (1, 2)}, ["third", 1]),
+            ({"third": (1,)}, ["third"]),
+        ]
+        for change, key_path in cases:
+            data = deepcopy(valid)
+            data.update(change)
+            with self.assertRaises(SchemaError) as err:
+                test_function(data)
+            self.assertEqual(err.exception.key_path, key_path)
+
+    def test_extra_keys_reported(self):
+        """Test that the first unexpected key in the data is the one reported."""
+        @schema
+        def test_function(arg: {"a": int}):
+            pass
+
+        with self.assertRaises(SchemaError) as err:
+            test_function({"a": 1, "b": 2, "c": 3})
+        self.assertIn("did not expect key b", err.exception.args[0])
+
+    def test_schema_allow_extra(self):
+        """Test that SchemaAllowExtra dicts accept keys not in the schema, while still checking the ones that are."""
+        @schema
+        def test_function(arg: {"open": SchemaAllowExtra({"a": int}), "closed": {"b": int}}):
+            pass
+
+        test_function({"open": {"a": 1}, "closed": {"b": 2}})
+        test_function({"open": {"a": 1, "extra": "x"}, "closed": {"b": 2}})
+        self.assertRaises(SchemaError, test_function, {"open": {"a": "1", "extra": "x"}, "closed": {"b": 2}})
+        self.assertRaises(SchemaError, test_function, {"open": {"extra": "x"}, "closed": {"b": 2}})
+        self.assertRaises(SchemaError, test_function, {"open": {"a": 1}, "closed": {"b": 2, "extra": "x"}})
+        self.assertRaises(SchemaError, test_function, {"open": [], "closed": {"b": 2}})
+
+    def test_schema_allow_extra_needs_dict(self):
+        self.assertRaises(TypeError, SchemaAllowExtra, [int])
+
+    def test_messages_are_built_lazily(self):
+        """Test that nothing is formatted until the message is asked for, and that large values are cut down."""
+        formatted = []
+
+        class Loud(object):
+            def __repr__(self):
+                formatted.append(self)
+                return "Loud()"
+
+        @schema
+        def test_function(arg: {"a": SchemaOr(int, str), "b": [int]}):
+            pass
+
+        for data in [{"a": Loud(), "b": []}, {"a": 1, "b": [1, Loud()]}]:
+            with self.assertRaises(SchemaError) as err:
+                test_function(data)
+            self.assertEqual(formatted, [])
+            self.assertIn("Loud()", str(err.exception))
+            count = len(formatted)
+            str(err.exception)
+            self.assertEqual(len(formatted), count)
+            del formatted[:]
+
+        with self.assertRaises(SchemaError) as err:
+            test_function({"a": 1, "b": list(range(100000)) + [None]})
+        with self.assertRaises(SchemaError) as large:
+            test_function({"a": 1, "b": [], "c": {str(i): "x" * 10000 for i in range(1000)}})
+        self.assertLess(len(str(large.exception)), 1000)
+        self.assertIn("...", str(large.exception))
+        self.assertIn("got value 'None'", err.exception.args[0])
+        self.assertEqual(repr(err.exception), "SchemaError({!r})".format(str(err.exception)))
+
+    def test_typecheck_messages_are_cut_down(self):
+        @typecheck
+        def test_function(a: int):
+            pass
+
+        with self.assertRaises(TypeError) as err:
+            test_function(list(range(100000)))
+        self.assertLess(len(str(err.exception)), 1000)
+
+
+class SchemaCodegenTestCase(unittest.TestCase):
+    """Tests for the codegen backend of py_types.runtime.schema"""
+    schemas_and_data = [
+        (test_schema, [{"hello": 5, "world": {"people": ["Alice"], "version": 1}},
+                       {"hello": 2, "world": {"people": ["Jack", "Jill"], "version": 0}, "optional": 20},
+                       {"hello": 4, "world": {"people": [], "version": 2}},
+                       {"hello": "what?!"},
+                       {"helloo": 5},
+                       [("hey", "you")],
+                       2,
+                       {"hello": 5, "world": {"people": "gone now"}},
+                       {"hello": 5, "world": {"people": ["Alice", 5], "version": 1}},
+                       {"hello": 5, "world": {"people": ["Alice"], "version": 1}, "optional": "no"}]),
+        ([[str], [int]], [[["a", "b"], [5, 6]], [["a"], [5]], [[5, 6], ["a", "b"]], [[5, 6]], (["a"], (5,))]),
+        (SchemaOr({"count": int}, float), [{"count": 5}, 5., {}, ["hello", 2]]),
+        ({"test": SchemaOr({"different_test": int}, type(None))},
+         [{"test": {"different_test": 5}}, {"test": None}, {}, {"test": {"different_test": {"other_test": 5}}},
+          {"wrong_key": {"different_test": 5}}, {"test": {"different_test": 5}, "extra_key": 7}, None]),
+        ({"test": (int, str)}, [{"test": (5, "left")}, {"test": [3, "right"]}, {"test": 5}, {"test": (5,)}]),
+        (SchemaAllowExtra({"a": int}), [{"a": 1}, {"a": 1, "b": 2}, {"b": 2}, {"a": "1", "b": 2}, [1]]),
+    ]
+
+    def test_non_finite_float_keys(self):
+        inf = float("inf")
+        validate = _generate_validator({inf: int, -inf: str})
+        self.assertTrue(validate({inf: 1, -inf: "a"}))
+        self.assertFalse(validate({inf: "1", -inf: "a"}))
+        self.assertFalse(validate({inf: 1}))
+
+    def test_generated_validators_are_bounded(self):
+        """Test that the codegen cache starts over once it's full, rather than growing for every new schema."""
+        # py_types.runtime.schema is also the name of the decorator, so patch the module itself.
+        with mock.patch.object(sys.modules[_generate_validator.__module__], "MAX_GENERATED_VALIDATORS", 3):
+            for _ in range(10):
+                validate = _generate_validator({"a": [int]})
+                self.assertTrue(validate({"a": [1]}))
+                self.assertLessEqual(len(_generated_validators), 3)
+
+    def test_backends_agree(self):
+        """Test that the codegen backend accepts and rejects the same data as the closure backend,
+        with the same error message."""
+        for form, datas in self.schemas_and_data:
+            def function(arg):
+                pass
+            function.__annotations__ = {"arg": form}
+            closures = schema(function)
+            codegen = schema(backend="codegen")(function)
+
+            for data in datas:
+                try:
+                    closures(data)
+                except SchemaError as closure_err:
+                    with self.assertRaises(SchemaError) as codegen_err:
+                        codegen(data)
+                    self.assertEqual(closure_err.args, codegen_err.exception.args)
+                else:
+                    codegen(data)
+
+    def test_generated_validators_are_cached(self):
+        form = {"a": [int]}
+
+        @schema(backend="codegen")
+        def first(arg: form):
+            pass
+
+        @schema(backend="codegen")
+        def second(arg: form):
+            pass
+
+        self.assertIs(_generate_validator(form), _generate_validator(form))
+        self.assertIn("for ", _generate_validator(form).source)
+
+    def test_deep_schemas_compile(self):
+        """Test that schemas nested deeper than python's block limit still generate valid source."""
+        form = int
+        data = 5
+        for _ in range(30):
+            form = {"a": [form]}
+            data = {"a": [data]}
+
+        @schema(backend="codegen")
+        def test_function(arg: form):
+            pass
+
+        test_function(data)
+        self.assertRaises(SchemaError, test_function, {"a": [data, None]})
+
+    def test_unknown_backend_throws(self):
+        self.assertRaises(ValueError, schema, backend="nope")
+
+
+class CheckedTestCase(unittest.TestCase):
+    """Tests for py_types.runtime.checked"""
+    def test_sorts_annotations(self):
+        """Test that each kind of annotation gets the right check and error type."""
+        @checked
+        def everything(a: int, b: Number, c: TypedSequence(str), d: {"e": [int]}, f: SchemaOr(int, str), g: "doc") -> int:
+            return a
+
+        everything(1, 2.5, ["x"], {"e": [1, 2]}, "s", object())
+        self.assertRaises(TypeError, everything, "1", 2.5, ["x"], {"e": [1]}, 1, None)
+        self.assertRaises(TypeError, everything, 1, "2.5", ["x"], {"e": [1]}, 1, None)
+        self.assertRaises(TypeError, everything, 1, 2.5, ["x", 1], {"e": [1]}, 1, None)
+        self.assertRaises(SchemaError, everything, 1, 2.5, ["x"], {"e": ["1"]}, 1, None)
+        self.assertRaises(SchemaError, everything, 1, 2.5, ["x"], {"e": [1]}, 1., None)
+
+    def test_return_checks(self):
+        @checked
+        def no_return() -> None:
+            return True
+
+        @checked
+        def bad_schema_return() -> {"a": int}:
+            return {"a": "b"}
+
+        self.assertRaises(TypeError, no_return)
+        self.assertRaises(SchemaError, bad_schema_return)
+
+    def test_single_wrapper(self):
+        @checked
+        def function(a: int, b: {"c": str}):
+            pass
+
+        self.assertFalse(hasattr(function.__wrapped__, "__wrapped__"))
+        function(1, b={"c": "d"})
+        self.assertRaises(SchemaError, function, 1, b={"c": 2})
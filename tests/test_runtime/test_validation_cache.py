@@ -0,0 +1,129 @@
+from py_types.runtime import (
+    checked,
+    schema,
+    SchemaError,
+    ValidationCache,
+)
+from py_types.validation_cache import (
+    default_cache,
+    is_immutable,
+)
+
+import pickle
+import unittest
+
+from .counting import (
+    checked_values,
+    Value,
+)
+
+
+cache = ValidationCache(maxsize=2)
+pairs_schema = [(Value, Value)]
+
+
+@schema(cache=cache)
+def closures(a: pairs_schema) -> None:
+    pass
+
+
+@schema(backend="codegen", cache=cache)
+def codegen(a: pairs_schema) -> None:
+    pass
+
+
+@checked(cache=cache)
+def mixed(a: pairs_schema, b: int) -> None:
+    pass
+
+
+class ValidationCacheTestCase(unittest.TestCase):
+    """Tests for py_types.validation_cache"""
+    def setUp(self):
+        cache.clear()
+        del checked_values[:]
+
+    def test_is_immutable(self):
+        self.assertTrue(is_immutable((1, "a", (None, 2.5, frozenset([b"x"])))))
+        self.assertFalse(is_immutable((1, [2])))
+        self.assertFalse(is_immutable(((1, {}),)))
+        self.assertFalse(is_immutable([1]))
+
+    def test_passing_tuples_are_checked_once(self):
+        pairs = ((1, "a"), (2, "b"))
+        closures(pairs)
+        self.assertEqual(checked_values, [1, "a", 2, "b"])
+        del checked_values[:]
+        closures(pairs)
+        codegen(pairs)
+        mixed(pairs, 1)
+        self.assertEqual(checked_values, [])
+        self.assertEqual(cache.info().hits, 3)
+
+        # Equal but separate data is checked again, and so is the same data against another schema.
+        closures(tuple(list(pairs)))
+        self.assertEqual(checked_values, [1, "a", 2, "b"])
+
+        @schema(cache=cache)
+        def other(a: [(Value, Value)]):
+            pass
+
+        del checked_values[:]
+        other(pairs)
+        self.assertEqual(checked_values, [1, "a", 2, "b"])
+
+    def test_failures_and_mutable_data_are_not_cached(self):
+        bad = ((1, None),)
+        self.assertRaises(SchemaError, closures, bad)
+        self.assertRaises(SchemaError, closures, bad)
+        self.assertRaises(SchemaError, codegen, bad)
+        listed = [(1, "a")]
+        closures(listed)
+        holding_list = ((1, "a"), [2, "b"])
+        closures(holding_list)
+        closures(holding_list)
+        self.assertEqual(cache.info().currsize, 0)
+        self.assertEqual(checked_values.count("b"), 2)
+
+    def test_lru_bound(self):
+        first, second, third = ((1, 1),), ((2, 2),), ((3, 3),)
+        closures(first)
+        closures(second)
+        closures(first)
+        closures(third)
+        self.assertEqual(cache.info().currsize, 2)
+        del checked_values[:]
+        closures(first)
+        closures(third)
+        self.assertEqual(checked_values, [])
+        closures(second)
+        self.assertEqual(checked_values, [2, 2])
+
+    def test_equal_values_are_not_shared(self):
+        local = ValidationCache()
+
+        @schema(cache=local)
+        def ints(a: [int]):
+            pass
+
+        ints((1,))
+        self.assertRaises(SchemaError, ints, (True, "1"))
+        self.assertEqual(local.info().currsize, 1)
+
+    def test_options(self):
+        self.assertRaises(TypeError, schema, cache=10)
+        self.assertRaises(TypeError, checked, cache="yes")
+        self.assertRaises(ValueError, ValidationCache, maxsize=0)
+
+        @schema(cache=True)
+        def default(a: [int]):
+            pass
+
+        default_cache.clear()
+        values = (1, 2)
+        default(values)
+        default(values)
+        self.assertEqual(default_cache.info().hits, 1)
+        self.assertIs(pickle.loads(pickle.dumps(default_cache)), default_cache)
+        copied = pickle.loads(pickle.dumps(cache))
+        self.assertEqual(copied.info(), (0, 0, 2, 0))
@@ -1,12 +1,17 @@
+import pickle
 import unittest
+from abc import ABC
 from unittest import mock
 from py_types.type_defs.base import (
     TypeFamily,
     ValidatedType,
+    validator_cost,
 )
 from py_types.type_defs.common import (
     Any,
+    Number,
 )
+from collections.abc import Sequence
 
 
 class TypeFamilyTestCase(unittest.TestCase):
@@ -76,6 +81,64 @@ class TypeFamilyTestCase(unittest.TestCase):
             type_members = [Any]
 
 
+    def test_verdicts_are_cached_per_type(self):
+        """Test that checks on type-only families are answered from a per-type cache."""
+        class NewType(metaclass=TypeFamily):
+            type_members = [int, Sequence]
+
+        self.assertTrue(NewType._type_only)
+        self.assertTrue(isinstance(5, NewType))
+        self.assertTrue(isinstance(6, NewType))
+        self.assertFalse(isinstance(5., NewType))
+        self.assertTrue(NewType._verdicts[int])
+        self.assertFalse(NewType._verdicts[float])
+
+    def test_cache_is_dropped_on_abc_register(self):
+        """Test that registering a class to an abstract base class member is seen by cached checks."""
+        class Registered(object):
+            pass
+
+        class LocalBase(ABC):
+            pass
+
+        class NewType(metaclass=TypeFamily):
+            type_members = [LocalBase]
+
+        self.assertFalse(isinstance(Registered(), NewType))
+        LocalBase.register(Registered)
+        self.assertTrue(isinstance(Registered(), NewType))
+
+    def test_value_dependent_members_are_not_cached(self):
+        """Test that families with ValidatedType members check every instance."""
+        class Positive(metaclass=ValidatedType):
+            type_members = [int]
+            validators = [lambda instance: instance > 0]
+
+        class NewType(metaclass=TypeFamily):
+            type_members = [Positive, str]
+
+        class OuterType(metaclass=TypeFamily):
+            type_members = [NewType]
+
+        self.assertFalse(NewType._type_only)
+        self.assertFalse(OuterType._type_only)
+        self.assertTrue(isinstance(5, OuterType))
+        self.assertFalse(isinstance(-5, OuterType))
+        self.assertTrue(isinstance("h", OuterType))
+
+    def test_pickling(self):
+        """Test that importable families pickle by reference, and others by their members."""
+        self.assertIs(pickle.loads(pickle.dumps(Number)), Number)
+
+        class NewType(metaclass=TypeFamily):
+            type_members = [str, Number]
+
+        copied = pickle.loads(pickle.dumps(NewType))
+        self.assertIsNot(copied, NewType)
+        self.assertEqual(copied.__qualname__, NewType.__qualname__)
+        for value, expected in [("h", True), (5, True), (5.0, True), (None, False), ([], False)]:
+            self.assertEqual(isinstance(value, copied), expected)
+
 class ValidatedTypeTestCase(unittest.TestCase):
     def set_up(self):
         pass
@@ -171,3 +234,61 @@ class ValidatedTypeTestCase(unittest.TestCase):
         self.assertTrue(isinstance([5], UnrelatedType))
         self.assertFalse(isinstance("h", UnrelatedType))
         self.assertFalse(isinstance(5, UnrelatedType))
+
+    def test_validators_short_circuit_cheapest_first(self):
+        """Test that validators run in order of cost, stopping at the first failure."""
+        calls = []
+
+        @validator_cost(10)
+        def expensive(instance):
+            calls.append("expensive")
+            return True
+
+        def default(instance):
+            calls.append("default")
+            return instance != 2
+
+        @validator_cost(0)
+        def cheap(instance):
+            calls.append("cheap")
+            return instance != 1
+
+        class NewType(metaclass=ValidatedType):
+            type_members = [int]
+            validators = [expensive, default, cheap]
+
+        self.assertTrue(isinstance(5, NewType))
+        self.assertEqual(calls, ["cheap", "default", "expensive"])
+
+        del calls[:]
+        self.assertFalse(isinstance(1, NewType))
+        self.assertEqual(calls, ["cheap"])
+
+        del calls[:]
+        self.assertFalse(isinstance(2, NewType))
+        self.assertEqual(calls, ["cheap", "default"])
+
+    def test_memoized_validators(self):
+        """Test that memoized types only run their validators once per immutable instance,
+        and don't mix up equal instances of different types."""
+        calls = []
+
+        def is_int(instance):
+            calls.append(instance)
+            return type(instance) is int
+
+        class NewType(metaclass=ValidatedType):
+            type_members = [int]
+            validators = [is_int]
+            memoize = 2
+
+        self.assertTrue(isinstance(1, NewType))
+        self.assertTrue(isinstance(1, NewType))
+        self.assertFalse(isinstance(True, NewType))
+        self.assertEqual(calls, [1, True])
+
+        class ChildType(NewType):
+            pass
+
+        self.assertTrue(isinstance(1, ChildType))
+        self.assertEqual(calls, [1, True, 1])
@@ -1,3 +1,5 @@
+import functools
+import pickle
 import unittest
 from py_types.type_defs.functions import Function
 from py_types.type_defs.common import Any
@@ -55,3 +57,52 @@ class FunctionTypeTestCase(unittest.TestCase):
             return lambda x: x + 1
 
         a = valid_function()
+
+    def test_verdicts_are_remembered_per_function(self):
+        """Test that verdicts are remembered per function, since closures sharing code can have different annotations."""
+        def make_function(return_type):
+            def function(variable) -> return_type:
+                return variable
+            return function
+
+        func = Function(1, int)
+        first, second = make_function(int), make_function(str)
+        self.assertTrue(isinstance(first, func))
+        self.assertIn(first, func._verdicts)
+        self.assertFalse(isinstance(second, func))
+        self.assertTrue(isinstance(first, func))
+        self.assertEqual(len(func._verdicts), 2)
+
+    def test_other_callables(self):
+        """Test that partials, bound methods, builtins and callable objects are checked by their signatures."""
+        class Callback(object):
+            def method(self, variable) -> int:
+                return int(variable)
+
+            def __call__(self, variable, other_variable):
+                return variable
+
+        def two_vars(variable, other_variable) -> int:
+            return int(other_variable * variable)
+
+        one_arg = Function(1, int)
+        two_args = Function(2, Any)
+        self.assertTrue(isinstance(functools.partial(two_vars, 2), one_arg))
+        self.assertFalse(isinstance(functools.partial(two_vars, 2), two_args))
+        self.assertTrue(isinstance(Callback().method, one_arg))
+        self.assertTrue(isinstance(Callback().method, one_arg))
+        self.assertTrue(isinstance(Callback(), two_args))
+        self.assertTrue(isinstance(abs, one_arg))
+        self.assertFalse(isinstance(5, one_arg))
+
+    def test_pickling(self):
+        """Test that Function instances pickle without their verdict caches."""
+        def one_var(variable) -> int:
+            return int(variable)
+
+        func = Function(1, int)
+        self.assertTrue(isinstance(one_var, func))
+        copied = pickle.loads(pickle.dumps(func))
+        self.assertEqual((copied.arity, copied.return_type), (1, int))
+        self.assertEqual(len(copied._verdicts), 0)
+        self.assertTrue(isinstance(one_var, copied))
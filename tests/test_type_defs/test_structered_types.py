@@ -1,10 +1,22 @@
 import unittest
+from array import array
 from py_types.type_defs.base import TypeFamily
-from py_types.type_defs.common import Any
+from py_types.type_defs.common import (
+    Any,
+    Number,
+)
+from py_types.type_defs.base import ValidatedType
 from py_types.type_defs.structured_types import (
     TypedSequence,
     TypedDict,
 )
+from py_types.validation_cache import ValidationCache
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 
 class StructuredTypesTestCase(unittest.TestCase):
     def setUp(self):
@@ -32,6 +44,49 @@ class StructuredTypesTestCase(unittest.TestCase):
         self.assertTrue(isinstance(valid, StrIntSequence))
         self.assertFalse(isinstance(invalid, StrIntSequence))
 
+    def test_sequence_stops_at_first_invalid_value(self):
+        """Test that values after the first invalid one aren't checked."""
+        checked = []
+
+        class Recorded(metaclass=ValidatedType):
+            type_members = [int]
+            validators = [lambda value: checked.append(value) or value > 0]
+
+        self.assertFalse(isinstance([1, -1, 2, 3], TypedSequence(Recorded)))
+        self.assertEqual(checked, [1, -1])
+
+    def test_sequence_type_runs(self):
+        """Test that type-only restrictions check mixed types correctly when skipping runs of one type."""
+        NumberSeq = TypedSequence(Number)
+        self.assertTrue(isinstance([1., 2., 3, 4, 5j, 1.], NumberSeq))
+        self.assertFalse(isinstance([1., 2., "3", 4.], NumberSeq))
+        self.assertFalse(isinstance([1., 2., 3., None], TypedSequence(float)))
+        self.assertTrue(isinstance((True, 1), TypedSequence(int)))
+
+    def test_homogenous_containers(self):
+        """Test that containers holding one type of element are checked by their type."""
+        self.assertTrue(isinstance(array("d", [1., 2.]), TypedSequence(float)))
+        self.assertTrue(isinstance(array("d", [1., 2.]), TypedSequence(Number)))
+        self.assertFalse(isinstance(array("d", [1., 2.]), TypedSequence(int)))
+        self.assertTrue(isinstance(array("i"), TypedSequence(str)))
+        self.assertTrue(isinstance(b"abc", TypedSequence(int)))
+        self.assertFalse(isinstance(bytearray(b"abc"), TypedSequence(str)))
+        self.assertTrue(isinstance(memoryview(array("q", [1, 2])), TypedSequence(int)))
+        self.assertFalse(isinstance(memoryview(array("f", [1., 2.])), TypedSequence(int)))
+
+        class Positive(metaclass=ValidatedType):
+            type_members = [int]
+            validators = [lambda value: value > 0]
+
+        self.assertFalse(isinstance(array("i", [1, -1]), TypedSequence(Positive)))
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_numpy_arrays(self):
+        self.assertTrue(isinstance(numpy.arange(5, dtype=float), TypedSequence(float)))
+        self.assertTrue(isinstance(numpy.arange(5, dtype=complex), TypedSequence(Number)))
+        self.assertFalse(isinstance(numpy.arange(5, dtype=float), TypedSequence(str)))
+        self.assertFalse(isinstance(numpy.zeros((2, 2)), TypedSequence(float)))
+
     def test_dict_isinstance_only_for_homogenous_dicts(self):
         """Test that a dict of all appropriate type will be determined an instance,
         and nothing else."""
@@ -66,3 +121,60 @@ class StructuredTypesTestCase(unittest.TestCase):
         self.assertTrue(isinstance(valid, StrIntValDict))
         self.assertFalse(isinstance(invalid, StrIntValDict))
         self.assertFalse(isinstance(also_invalid, StrIntValDict))
+
+    def test_dict_falsy_keys_are_checked(self):
+        """Regression test where keys like 0 and "" skipped the key check."""
+        StrIntDict = TypedDict(str, int)
+        self.assertFalse(isinstance({0: 1}, StrIntDict))
+        self.assertTrue(isinstance({"": 1}, StrIntDict))
+        self.assertFalse(isinstance({"a": {0: 1}}, StrIntDict))
+
+    def test_sequence_cache(self):
+        """Test that tuples which already matched aren't checked again, and lists always are."""
+        checked_values = []
+
+        class Counted(type):
+            def __instancecheck__(cls, instance):
+                checked_values.append(instance)
+                return isinstance(instance, int)
+
+        class Value(metaclass=Counted):
+            pass
+
+        cache = ValidationCache()
+        ValueSeq = TypedSequence(Value, cache=cache)
+        values = (1, 2, 3)
+        self.assertTrue(isinstance(values, ValueSeq))
+        self.assertTrue(isinstance(values, ValueSeq))
+        self.assertEqual(checked_values, [1, 2, 3])
+        self.assertEqual(cache.info().hits, 1)
+
+        del checked_values[:]
+        self.assertFalse(isinstance((1, "h"), ValueSeq))
+        self.assertFalse(isinstance((1, "h"), ValueSeq))
+        listed = [1, 2]
+        self.assertTrue(isinstance(listed, ValueSeq))
+        self.assertTrue(isinstance(listed, ValueSeq))
+        self.assertEqual(checked_values, [1, "h", 1, "h", 1, 2, 1, 2])
+        self.assertRaises(TypeError, TypedSequence, int, cache=1024)
+
+    def test_deeply_nested_dicts(self):
+        """Test that dicts nested past the recursion limit can still be checked."""
+        deep = {"a": 1}
+        for _ in range(5000):
+            deep = {"a": deep}
+
+        self.assertTrue(isinstance(deep, TypedDict(str, int)))
+        self.assertFalse(isinstance(deep, TypedDict(str, str)))
+
+    def test_dict_budgets(self):
+        """Test that dicts past max_depth or max_nodes aren't instances."""
+        nested = {"a": {"b": {"c": 1}}, "d": 2}
+        self.assertTrue(isinstance(nested, TypedDict(str, int, max_depth=3, max_nodes=4)))
+        self.assertFalse(isinstance(nested, TypedDict(str, int, max_depth=2)))
+        self.assertFalse(isinstance(nested, TypedDict(str, int, max_nodes=3)))
+
+    def test_cyclic_dicts(self):
+        cyclic = {"a": 1}
+        cyclic["self"] = cyclic
+        self.assertTrue(isinstance(cyclic, TypedDict(str, int)))